@@ -0,0 +1,311 @@
+# Batched Lawyer Ranking
+# This file ranks many queries at once with matrix operations over the lawyer x skill
+# matrix, returning the same match dicts as match_lawyers_with_domain_expertise
+
+import bisect
+
+import numpy as np
+
+from domain_batch import DOMAIN_VOCABULARY, domain_strength_matrix
+from facets import facet_filter_mask
+from legal_domains import LEGAL_DOMAINS, fallback_keyword_matching
+from roster_version import cached_per_roster_version
+
+# Skill weights used by evaluate_domain_expertise
+DIRECT_DOMAIN_WEIGHT = 3.0
+DOMAIN_TERM_WEIGHT = 1.5
+
+# Fixed-point scale of the integer scoring kernel: both skill weights become
+# integers (6 and 3), so domain scores are exact integer sums of skill points
+WEIGHT_SCALE = 2
+
+# Number of matched skills kept per match
+MATCHED_SKILLS_SHOWN = 5
+
+# Function to build the domain x skill affinity matrix
+def build_domain_skill_weights(unique_skills, domain_names=None):
+    """
+    Weights each skill for each domain: 3.0 when the skill names the domain, 1.5 when
+    it contains one of the domain's terms, 0 otherwise
+
+    Args:
+        unique_skills (list): Skill vocabulary, in skill matrix column order
+        domain_names (list): Domains, defining the row order
+
+    Returns:
+        np.ndarray: float64 matrix with one row per domain and one column per skill
+    """
+    domain_names = domain_names or DOMAIN_VOCABULARY.domain_names
+    weights = np.zeros((len(domain_names), len(unique_skills)))
+
+    for row, domain_name in enumerate(domain_names):
+        domain_lower = domain_name.lower()
+        domain_terms = [term.lower() for term in LEGAL_DOMAINS[domain_name]]
+        for column, skill in enumerate(unique_skills):
+            skill_lower = skill.lower()
+            if domain_lower in skill_lower:
+                weights[row, column] = DIRECT_DOMAIN_WEIGHT
+            elif any(term in skill_lower for term in domain_terms):
+                weights[row, column] = DOMAIN_TERM_WEIGHT
+
+    return weights
+
+# Function to compute the domain scores of a block of lawyers with integer arithmetic
+def integer_domain_scores(weights, skill_matrix):
+    """
+    Computes the fixed-point domain scores (WEIGHT_SCALE x the weighted sum of skill
+    points) of every lawyer from the quantised uint8 skill matrix. Each domain only
+    weights a few skills, so every score is a couple of column sums taken in int32
+    rather than a dense float product. Divided by WEIGHT_SCALE, the scores equal the
+    float weights @ points products exactly.
+
+    Args:
+        weights (np.ndarray): domain x skill weights from build_domain_skill_weights
+        skill_matrix (np.ndarray): lawyers x skills uint8 skill points
+
+    Returns:
+        np.ndarray: int32 matrix with one row per domain and one column per lawyer
+    """
+    quantised = np.rint(weights * WEIGHT_SCALE).astype(np.int32)
+    if not np.array_equal(quantised, weights * WEIGHT_SCALE):
+        raise ValueError(f"Skill weights are not multiples of 1/{WEIGHT_SCALE}")
+
+    scores = np.zeros((weights.shape[0], skill_matrix.shape[0]), dtype=np.int32)
+    for row, domain_weights in enumerate(quantised):
+        for weight in np.unique(domain_weights[domain_weights != 0]):
+            columns = np.flatnonzero(domain_weights == weight)
+            scores[row] += weight * skill_matrix[:, columns].sum(axis=1, dtype=np.int32)
+
+    return scores
+
+# Function to build the roster-dependent part of the ranking
+def build_ranking_index(data):
+    """
+    Precomputes everything that does not depend on the query
+
+    Args:
+        data (dict): The lawyer data structure, including 'skill_matrix'
+
+    Returns:
+        dict: 'weights' (domain x skill), 'domain_scores' (domain x lawyer, the
+              unweighted domain score of every lawyer in WEIGHT_SCALE fixed point),
+              'eligible' (the active-lawyer mask) and 'skill_columns'
+              (skill name to column)
+    """
+    weights = build_domain_skill_weights(data['unique_skills'])
+
+    return {
+        'weights': weights,
+        'domain_scores': integer_domain_scores(weights, data['skill_matrix']),
+        'eligible': np.array(data['active_mask'], dtype=bool),
+        'skill_columns': {skill: column for column, skill in enumerate(data['unique_skills'])}
+    }
+
+# Function to get the cached ranking index for the current roster version
+get_ranking_index = cached_per_roster_version("ranking_index", build_ranking_index)
+
+# Function to pick the top N columns of each row
+def top_n_indices(scores, top_n):
+    """
+    Returns the positive-score columns of each row with the N highest scores, ties
+    broken by column order (the order a stable descending sort gives)
+
+    Args:
+        scores (np.ndarray): queries x lawyers scores
+        top_n (int): Number of columns kept per row
+
+    Returns:
+        list: One array of column indices per row, best first
+    """
+    results = []
+    for row in scores:
+        candidates = np.flatnonzero(row > 0)
+        if len(candidates) > top_n:
+            # Keep everything tied with the N-th best score, then order exactly
+            candidate_scores = row[candidates]
+            threshold = candidate_scores[np.argpartition(-candidate_scores, top_n - 1)[top_n - 1]]
+            candidates = candidates[row[candidates] >= threshold]
+        order = np.lexsort((candidates, -row[candidates]))
+        results.append(candidates[order[:top_n]])
+    return results
+
+# Function to summarise the weight each skill gets from a query's domains
+def query_skill_weights(index, domain_rows):
+    """
+    Computes, once per query, the highest weight any of the query's domains gives
+    each skill and the first of those domains giving it
+
+    Args:
+        index (dict): Ranking index
+        domain_rows (np.ndarray): Row of each query domain in the weight matrix
+
+    Returns:
+        tuple: (best weight per skill, position in domain_rows of the first domain
+               with that weight), both over the skill vocabulary
+    """
+    domain_weights = index['weights'][domain_rows]
+    best_weights = domain_weights.max(axis=0)
+    return best_weights, np.argmax(domain_weights == best_weights, axis=0)
+
+# Function to build the match dict of one lawyer for one query
+def build_match(lawyer, lawyer_row, score, domain_rows, query_domain_names, index, skill_weights):
+    """
+    Builds a match dict identical to the one match_lawyers_with_domain_expertise returns.
+    Matched domains are read off the lawyer's precomputed domain vector, and matched
+    skills are taken from the lawyer's skills in their presorted (descending points)
+    order, stopping once no remaining skill can reach the kept ones.
+
+    Args:
+        lawyer (dict): Lawyer profile
+        lawyer_row (int): Roster row of the lawyer
+        score (float): Total score of the lawyer for the query
+        domain_rows (list): Row of each query domain in the weight matrix
+        query_domain_names (list): The query's domains, in identify_query_domains order
+        index (dict): Ranking index
+        skill_weights (tuple): query_skill_weights of the query
+
+    Returns:
+        dict: Match with score, matched skills and domains
+    """
+    domain_vector = index['domain_scores'][:, lawyer_row]
+    matched_domains = [
+        domain_name for row, domain_name in zip(domain_rows, query_domain_names) if domain_vector[row] > 0
+    ]
+
+    # evaluate_domain_expertise lists a skill once per matching domain and keeps its
+    # best entry: highest weighted score, then earliest domain, then the lawyer's order
+    best_weights, first_domains = skill_weights
+    max_weight = best_weights.max()
+    skills = lawyer['skills']
+    skill_ids, skill_values = skills.ids, skills.values_array
+    kept = []
+    for position in skills.top_positions:
+        value = skill_values[position]
+        if len(kept) >= MATCHED_SKILLS_SHOWN and value * max_weight < -kept[-1][0]:
+            break
+        weight = best_weights[skill_ids[position]]
+        if weight:
+            bisect.insort(kept, (-value * weight, first_domains[skill_ids[position]], position))
+            del kept[MATCHED_SKILLS_SHOWN:]
+
+    matched_skills = []
+    for _, _, position in kept:
+        skill_name, skill_value = skills.entry(position)
+        matched_skills.append({"skill": skill_name, "value": skill_value})
+
+    return {
+        'lawyer': lawyer,
+        'score': score,
+        'matched_skills': matched_skills,
+        'matched_domains': matched_domains,
+        'has_domain_expertise': bool(matched_domains)
+    }
+
+# Function to combine the active-lawyer mask with the facet selections
+def eligible_lawyers(data, index, facet_filters=None):
+    """
+    Returns the mask of lawyers that may appear in results: active lawyers passing
+    the facet selections
+
+    Args:
+        data (dict): The lawyer data structure
+        index (dict): Ranking index
+        facet_filters (dict): Optional facet selections
+
+    Returns:
+        np.ndarray: Boolean mask over the roster
+    """
+    eligible = index['eligible']
+    if facet_filters and 'facet_index' in data:
+        facet_mask = facet_filter_mask(data['facet_index'], facet_filters)
+        if facet_mask is not None:
+            eligible = eligible & facet_mask
+    return eligible
+
+# Function to score queries against a block of lawyers
+def score_queries(strengths, domain_scores, eligible):
+    """
+    Computes (query x domain strengths) x (domain x lawyer scores). Domains are
+    accumulated one by one, in the order evaluate_domain_expertise adds the weighted
+    domain scores, so totals (and therefore ties) match it exactly.
+
+    Args:
+        strengths (np.ndarray): queries x domains strengths
+        domain_scores (np.ndarray): domains x lawyers fixed-point domain scores
+        eligible (np.ndarray): Boolean mask over the lawyers
+
+    Returns:
+        np.ndarray: queries x lawyers scores (0 for ineligible lawyers)
+    """
+    scores = np.zeros((strengths.shape[0], domain_scores.shape[1]))
+    for row in np.flatnonzero(strengths.any(axis=0)):
+        # Halving the integer scores is exact, so the products match the float path
+        scores += strengths[:, row:row + 1] * (domain_scores[row] / WEIGHT_SCALE)
+    scores[:, ~eligible] = 0.0
+    return scores
+
+# Function to turn the selected lawyers of each query into match dicts
+def build_batch_results(data, queries, strengths, selections, top_n=5, facet_filters=None):
+    """
+    Builds the match lists of a batch from the selected lawyers
+
+    Args:
+        data (dict): The lawyer data structure
+        queries (list): Search queries
+        strengths (np.ndarray): queries x domains strengths
+        selections (list): Per query, (lawyer indices best first, their scores)
+        top_n (int): Number of matches per query (used by the keyword fallback)
+        facet_filters (dict): Optional facet selections (used by the keyword fallback)
+
+    Returns:
+        list: One list of matches per query
+    """
+    index = get_ranking_index(data)
+    lawyers = data['lawyers']
+    domain_names = DOMAIN_VOCABULARY.domain_names
+
+    results = []
+    for query_row, (columns, column_scores) in enumerate(selections):
+        domain_rows = np.flatnonzero(strengths[query_row])
+        if len(domain_rows) == 0:
+            results.append(fallback_keyword_matching(data, queries[query_row], top_n, facet_filters))
+            continue
+
+        query_domain_names = [domain_names[row] for row in domain_rows]
+        skill_weights = query_skill_weights(index, domain_rows)
+        results.append([
+            build_match(lawyers[column], column, float(score), domain_rows, query_domain_names, index, skill_weights)
+            for column, score in zip(columns, column_scores)
+        ])
+
+    return results
+
+# Main function to rank lawyers for many queries at once
+def rank_lawyers_batch(data, queries, top_n=5, facet_filters=None):
+    """
+    Batched match_lawyers_with_domain_expertise: scores every query against every
+    lawyer as (query x domain strengths) x (domain x lawyer scores) and keeps the
+    top N of each row. Queries without any identified domain use keyword matching.
+
+    Args:
+        data (dict): The lawyer data structure, including 'skill_matrix'
+        queries (list): Search queries
+        top_n (int): Number of top matches to return per query
+        facet_filters (dict): Optional facet selections applied to every query
+
+    Returns:
+        list: One list of matches per query, each as match_lawyers_with_domain_expertise
+              would return it
+    """
+    if not data or not queries:
+        return [[] for _ in queries]
+
+    index = get_ranking_index(data)
+    strengths = domain_strength_matrix(queries)
+    scores = score_queries(strengths, index['domain_scores'], eligible_lawyers(data, index, facet_filters))
+
+    selections = [
+        (columns, scores[query_row, columns])
+        for query_row, columns in enumerate(top_n_indices(scores, top_n))
+    ]
+    return build_batch_results(data, queries, strengths, selections, top_n, facet_filters)
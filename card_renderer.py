@@ -0,0 +1,200 @@
+# Lawyer Card Rendering
+# This file builds the HTML for the result cards from precompiled templates so a
+# whole page of results can be sent to Streamlit as a single element
+
+import html
+import math
+from string import Template
+
+# Number of result cards shown per page
+RESULTS_PAGE_SIZE = 10
+
+# Rationale shown when the LLM returned nothing for a lawyer
+DEFAULT_RATIONALE = "This lawyer has relevant expertise in the areas described in the client query."
+
+# Templates are compiled once at import. Lines are kept unindented so Markdown
+# never mistakes part of a card for a code block.
+CARD_TEMPLATE = Template(
+    '<div class="lawyer-card">'
+    '<div class="lawyer-name">$name <span class="$availability_class">$availability</span></div>'
+    '<div class="lawyer-email">$email</div>'
+    '<div class="practice-area">Practice Area: $practice_area</div>'
+    '$bio_html'
+    '<div class="availability-details">$availability_details</div>'
+    '$vacation_html'
+    '$engagement_html'
+    '$industry_html'
+    '<div class="billable-rate">Rate: $billable_rate | Recent Client: $last_client</div>'
+    '$matched_domains_html'
+    '<div style="margin-top: 10px;"><strong>Relevant Expertise:</strong> $domain_tag<br/>$skill_tags</div>'
+    '<div class="reasoning-box"><div class="match-rationale-title">MATCH ANALYSIS:</div>$rationale</div>'
+    '</div>'
+)
+BIO_TEMPLATE = Template('<div class="bio-section">$level_html$details_html$experience_html</div>')
+SKILL_TAG_TEMPLATE = Template('<span class="skill-tag">$skill: $value</span>')
+DOMAIN_EXPERT_TAG = (
+    '<span style="background-color: #e8f5e9; color: #2e7d32; border-radius: 10px; '
+    'padding: 2px 8px; font-size: 12px; margin-left: 10px;">Domain Expert</span>'
+)
+
+# Shorthand for escaping any value (numbers, None) as HTML text. "$" is escaped too,
+# otherwise two rates in one batched element ("$400-500/hr") pair up as LaTeX, and
+# line breaks are flattened since a blank line would end the HTML block mid-batch.
+def _escape(value):
+    text = html.escape(str(value), quote=True).replace("$", "&#36;")
+    return " ".join(text.splitlines())
+
+# Function to pick the CSS class of the availability tag
+def availability_class(availability):
+    """
+    Chooses the availability tag style for a status
+
+    Args:
+        availability (str): Availability status
+
+    Returns:
+        str: CSS class name
+    """
+    if "Limited" in availability or "Vacation" in availability or "Not Available" in availability:
+        return "availability-tag-limited"
+    if "Available" in availability:
+        return "availability-tag-available"
+    if "Ad Hoc" in availability:
+        return "availability-tag-adhoc"
+    return "availability-tag"
+
+# Function to build the biographical section of a card
+def render_bio_section(bio):
+    """
+    Builds the biographical block of a card
+
+    Args:
+        bio (dict): Lawyer bio fields
+
+    Returns:
+        str: HTML for the bio section (empty when there is no bio)
+    """
+    if not bio:
+        return ""
+
+    level_html = f'<div class="bio-level">{_escape(bio["level"])}</div>' if bio.get('level') else ""
+
+    bio_details = []
+    if bio.get('call'):
+        bio_details.append(f'Called to Bar: {_escape(bio["call"])}')
+    if bio.get('jurisdiction'):
+        bio_details.append(f'Jurisdiction: {_escape(bio["jurisdiction"])}')
+    if bio.get('location'):
+        bio_details.append(f'Location: {_escape(bio["location"])}')
+    details_html = f'<div class="bio-details">{" | ".join(bio_details)}</div>' if bio_details else ""
+
+    experience = []
+    if bio.get('previous_in_house'):
+        experience.append(f'<div class="bio-experience"><strong>In-House Experience:</strong> {_escape(bio["previous_in_house"])}</div>')
+    if bio.get('previous_firms'):
+        experience.append(f'<div class="bio-experience"><strong>Previous Firms:</strong> {_escape(bio["previous_firms"])}</div>')
+    if bio.get('education'):
+        experience.append(f'<div class="bio-education"><strong>Education:</strong> {_escape(bio["education"])}</div>')
+
+    return BIO_TEMPLATE.substitute(
+        level_html=level_html,
+        details_html=details_html,
+        experience_html="".join(experience)
+    )
+
+# Function to build the HTML for one result card
+def render_lawyer_card(match, reasoning):
+    """
+    Builds the HTML card for a single match
+
+    Args:
+        match (dict): Match returned by the matcher
+        reasoning (dict): Lawyer name mapped to the match rationale
+
+    Returns:
+        str: HTML for the card
+    """
+    lawyer = match['lawyer']
+    bio = lawyer.get('bio') or {}
+
+    availability_details = []
+    if lawyer['days_available'] is not None:
+        availability_details.append(f"Days available: {_escape(lawyer['days_available'])} | ")
+    if lawyer['hours_available'] is not None:
+        availability_details.append(f"Hours available: {_escape(lawyer['hours_available'])}")
+
+    vacation_html = ""
+    if lawyer['vacation']:
+        vacation_dates = ", ".join(lawyer['vacation']) if isinstance(lawyer['vacation'], (list, tuple)) else lawyer['vacation']
+        vacation_html = f'<div class="vacation-info">Vacation: {_escape(vacation_dates)}</div>'
+
+    engagement_html = ""
+    if lawyer['engagement_note']:
+        engagement_html = f'<div class="engagement-note">{_escape(lawyer["engagement_note"])}</div>'
+
+    industry_html = ""
+    if bio.get('industry_experience'):
+        industry_html = f'<div class="industry-experience"><strong>Industry Experience:</strong> {_escape(bio["industry_experience"])}</div>'
+
+    matched_domains_html = ""
+    if match.get("matched_domains"):
+        matched_domains_html = (
+            '<div style="margin-top: 5px;"><strong>Expertise Areas:</strong> '
+            + _escape(", ".join(match["matched_domains"])) + '</div>'
+        )
+
+    skill_tags = "".join(
+        SKILL_TAG_TEMPLATE.substitute(skill=_escape(skill["skill"]), value=_escape(skill["value"]))
+        for skill in match['matched_skills']
+    )
+
+    return CARD_TEMPLATE.substitute(
+        name=_escape(lawyer['name']),
+        availability_class=availability_class(lawyer['availability']),
+        availability=_escape(lawyer['availability']),
+        email=_escape(lawyer['email']),
+        practice_area=_escape(lawyer['practice_area']),
+        bio_html=render_bio_section(bio),
+        availability_details="".join(availability_details),
+        vacation_html=vacation_html,
+        engagement_html=engagement_html,
+        industry_html=industry_html,
+        billable_rate=_escape(lawyer['billable_rate']),
+        last_client=_escape(lawyer['last_client']),
+        matched_domains_html=matched_domains_html,
+        domain_tag=DOMAIN_EXPERT_TAG if match.get("has_domain_expertise") else "",
+        skill_tags=skill_tags,
+        rationale=_escape(reasoning.get(lawyer['name'], DEFAULT_RATIONALE))
+    )
+
+# Function to build the HTML for a batch of result cards
+def render_lawyer_cards(matches, reasoning):
+    """
+    Builds the HTML for several cards so they can be emitted as one Streamlit element
+
+    Args:
+        matches (list): Matches to render, in display order
+        reasoning (dict): Lawyer name mapped to the match rationale
+
+    Returns:
+        str: Concatenated HTML for all cards
+    """
+    return "".join(render_lawyer_card(match, reasoning) for match in matches)
+
+# Function to slice a result list into pages
+def paginate(items, page, page_size=RESULTS_PAGE_SIZE):
+    """
+    Returns one page of a result list
+
+    Args:
+        items (list): Full result list
+        page (int): 1-based page number (clamped to the valid range)
+        page_size (int): Number of items per page
+
+    Returns:
+        tuple: (items on the page, total number of pages)
+    """
+    page_count = max(1, math.ceil(len(items) / page_size))
+    page = min(max(1, page), page_count)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], page_count
@@ -0,0 +1,208 @@
+# Claude Messages API Client
+# This file sends the rationale requests to the Claude Messages API, marking the
+# instructions and lawyer profiles as a cacheable prompt prefix when it is long
+# enough to be cached
+
+import json
+import os
+import threading
+
+import requests
+
+from prompt_builder import estimate_tokens
+from rationale_parser import RationaleStreamParser
+
+# API endpoint; ANTHROPIC_BASE_URL can point at a proxy or a local mock server
+ANTHROPIC_BASE_URL = os.environ.get("ANTHROPIC_BASE_URL", "https://api.anthropic.com").rstrip("/")
+MESSAGES_URL = f"{ANTHROPIC_BASE_URL}/v1/messages"
+
+# Use Haiku for faster responses
+RATIONALE_MODEL = "claude-3-haiku-20240307"
+RATIONALE_MAX_TOKENS = 1000
+
+SYSTEM_PROMPT = "You are a legal resource coordinator that analyzes lawyer expertise matches. You provide brief, factual explanations about why specific lawyers match particular client legal needs based on their self-reported skills. Focus primarily on skills and expertise rather than biographical information. Keep explanations concise and focused on the relevant expertise."
+
+# Shortest prompt prefix the model caches; a cache breakpoint on a shorter prefix is
+# ignored by the API (Haiku models need 2048 tokens, most others 1024). The prefix
+# is bounded by prompt_builder.PROMPT_TOKEN_BUDGET, which must stay above this.
+MIN_CACHEABLE_PROMPT_TOKENS = 2048
+
+# Request timeout in seconds (connect, read)
+REQUEST_TIMEOUT = (5, 60)
+
+# Class accumulating prompt-cache usage reported by the API
+class PromptCacheStats:
+    """
+    Thread-safe counters of prompt-cache usage across all requests in the process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.input_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage):
+        """
+        Records the usage block of one API response. A request counts as a hit when
+        part of its prompt was read from the cache.
+
+        Args:
+            usage (dict): The response's "usage" object
+        """
+        usage = usage or {}
+        cache_read = usage.get("cache_read_input_tokens") or 0
+        with self._lock:
+            self.requests += 1
+            if cache_read > 0:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.input_tokens += usage.get("input_tokens") or 0
+            self.cache_read_input_tokens += cache_read
+            self.cache_creation_input_tokens += usage.get("cache_creation_input_tokens") or 0
+            self.output_tokens += usage.get("output_tokens") or 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "input_tokens": self.input_tokens,
+                "cache_read_input_tokens": self.cache_read_input_tokens,
+                "cache_creation_input_tokens": self.cache_creation_input_tokens,
+                "output_tokens": self.output_tokens
+            }
+
+# Process-wide prompt-cache counters
+PROMPT_CACHE_STATS = PromptCacheStats()
+
+# Function to build the Messages API payload for a rationale request
+def build_rationale_payload(prompt):
+    """
+    Builds the request payload. Content is ordered from most to least stable: the
+    system prompt and instructions, then the lawyer profiles, then the client's need.
+    One cache breakpoint after the profiles lets a different query that matches the
+    same lawyers reuse the prefix (the search cache only covers the same query). The
+    instructions alone are far below the minimum cacheable prefix, so they get no
+    breakpoint of their own, and neither do profiles that leave the prefix too short.
+
+    Args:
+        prompt (dict or str): Parts from prompt_builder.build_rationale_prompt_parts,
+                              or a plain prompt string (sent without caching)
+
+    Returns:
+        dict: JSON payload for the Messages API
+    """
+    payload = {
+        "model": RATIONALE_MODEL,
+        "max_tokens": RATIONALE_MAX_TOKENS,
+        "temperature": 0.0
+    }
+
+    if isinstance(prompt, str):
+        payload["system"] = SYSTEM_PROMPT
+        payload["messages"] = [{"role": "user", "content": prompt}]
+        return payload
+
+    payload["system"] = [
+        {"type": "text", "text": SYSTEM_PROMPT},
+        {"type": "text", "text": prompt['instructions']}
+    ]
+
+    profiles_block = {"type": "text", "text": prompt['profiles']}
+    prefix_tokens = sum(estimate_tokens(text) for text in (SYSTEM_PROMPT, prompt['instructions'], prompt['profiles']))
+    if prefix_tokens >= MIN_CACHEABLE_PROMPT_TOKENS:
+        profiles_block["cache_control"] = {"type": "ephemeral"}
+
+    payload["messages"] = [{
+        "role": "user",
+        "content": [profiles_block, {"type": "text", "text": prompt['request']}]
+    }]
+    return payload
+
+# Function to stream a rationale request, yielding the text as it arrives
+def stream_rationale_request(prompt, api_key, timeout=REQUEST_TIMEOUT):
+    """
+    Sends a streaming rationale request and yields text deltas from the
+    server-sent events, skipping events that are not valid JSON. Prompt-cache usage
+    is recorded once the stream ends.
+
+    Args:
+        prompt (dict or str): Prompt parts or plain prompt string
+        api_key (str): Anthropic API key
+        timeout (tuple): requests timeout (connect, read between events) in seconds
+
+    Yields:
+        str: Pieces of the response text
+
+    Raises:
+        requests.RequestException: On network errors
+        RuntimeError: When the API answers with a non-200 status or an error event
+    """
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json"
+    }
+    payload = dict(build_rationale_payload(prompt), stream=True)
+
+    usage = {}
+    with requests.post(MESSAGES_URL, headers=headers, json=payload, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"API call failed with status code {response.status_code}: {response.text}")
+
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[len("data:"):])
+                except ValueError:
+                    # A garbled event is skipped; the text streamed so far stays usable
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                event_type = event.get("type")
+                delta = event.get("delta") or {}
+
+                if event_type == "content_block_delta" and delta.get("type") == "text_delta":
+                    yield delta.get("text", "")
+                elif event_type == "message_start":
+                    usage.update((event.get("message") or {}).get("usage") or {})
+                elif event_type == "message_delta":
+                    usage.update(event.get("usage") or {})
+                elif event_type == "error":
+                    raise RuntimeError(f"API stream error: {event.get('error')}")
+        finally:
+            if usage:
+                PROMPT_CACHE_STATS.record(usage)
+
+# Function to fetch the rationales for a prompt, keeping partial results
+def fetch_rationales(prompt, api_key, timeout=REQUEST_TIMEOUT):
+    """
+    Streams a rationale request and parses the pairs as they arrive, so a truncated
+    or interrupted response still yields every lawyer whose rationale was completed
+
+    Args:
+        prompt (dict or str): Prompt parts or plain prompt string
+        api_key (str): Anthropic API key
+        timeout (tuple): requests timeout (connect, read between events) in seconds
+
+    Returns:
+        dict: Lawyer names mapped to rationales, or {"error": message} when nothing
+              usable came back
+    """
+    parser = RationaleStreamParser()
+    try:
+        for chunk in stream_rationale_request(prompt, api_key, timeout):
+            parser.feed(chunk)
+    except (RuntimeError, requests.RequestException) as e:
+        return parser.rationales or {"error": f"API error: {e}"}
+
+    return parser.rationales or {"error": "Could not extract JSON from Claude's response"}
@@ -0,0 +1,153 @@
+# Batched Domain Identification
+# This file scores many queries against the legal domains at once, producing a
+# query x domain strength matrix with the same formula as identify_query_domains
+
+import numpy as np
+
+from legal_domains import LEGAL_DOMAINS
+
+# Separator placed between queries when they are scanned as one string; no domain
+# term contains it, so a match can never span two queries
+QUERY_SEPARATOR = "\x00"
+
+# Class holding the compiled term vocabulary of the legal domains
+class DomainVocabulary:
+    """
+    Compiled form of LEGAL_DOMAINS: each distinct lowercase term appears once, with
+    per-domain counts of how often it is listed (and whether it is multi-word), so the
+    strength formula can be evaluated with array operations
+    """
+
+    def __init__(self, legal_domains):
+        self.domain_names = list(legal_domains)
+        self.domain_patterns = [name.lower() for name in self.domain_names]
+
+        term_columns = {}
+        rows, columns, multiword = [], [], []
+        for column, terms in enumerate(legal_domains.values()):
+            for term in terms:
+                pattern = term.lower()
+                rows.append(term_columns.setdefault(pattern, len(term_columns)))
+                columns.append(column)
+                multiword.append(len(term.split()) > 1)
+        self.terms = list(term_columns)
+
+        # term x domain counts (a term listed twice under a domain counts twice,
+        # as it does in domain_matches)
+        shape = (len(self.terms), len(self.domain_names))
+        self.term_domain_counts = np.zeros(shape, dtype=np.int32)
+        self.term_domain_multiword = np.zeros(shape, dtype=np.int32)
+        np.add.at(self.term_domain_counts, (rows, columns), 1)
+        np.add.at(self.term_domain_multiword, (rows, columns), np.asarray(multiword, dtype=np.int32))
+
+        self.domain_term_totals = np.array([len(terms) for terms in legal_domains.values()], dtype=np.float64)
+
+# Compiled vocabulary for the built-in legal domains
+DOMAIN_VOCABULARY = DomainVocabulary(LEGAL_DOMAINS)
+
+# Function to find which queries contain each pattern
+def pattern_incidence(lower_queries, patterns):
+    """
+    Builds the sparse query x pattern incidence of substring matches
+
+    Args:
+        lower_queries (list): Lowercased queries
+        patterns (list): Lowercase patterns to look for
+
+    Returns:
+        tuple: (query indices, pattern indices) of every query containing a pattern,
+               each pair listed once
+    """
+    text = QUERY_SEPARATOR.join(lower_queries)
+    # Start offset of every query in the joined text
+    starts = np.cumsum([0] + [len(query) + 1 for query in lower_queries[:-1]])
+
+    query_indices, pattern_indices = [], []
+    for pattern_index, pattern in enumerate(patterns):
+        positions = []
+        position = text.find(pattern)
+        while position >= 0:
+            positions.append(position)
+            position = text.find(pattern, position + 1)
+        if positions:
+            hit_queries = np.unique(np.searchsorted(starts, positions, side="right") - 1)
+            query_indices.append(hit_queries)
+            pattern_indices.append(np.full(len(hit_queries), pattern_index))
+
+    if not query_indices:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(query_indices), np.concatenate(pattern_indices)
+
+# Function to add up the per-match rows of each query
+def sum_rows_by_query(query_indices, rows, shape):
+    """
+    Sums the rows belonging to each query (a sparse incidence x dense matrix product)
+
+    Args:
+        query_indices (np.ndarray): Query index of each row
+        rows (np.ndarray): One row of per-domain values per match
+        shape (tuple): (number of queries, number of domains)
+
+    Returns:
+        np.ndarray: float64 matrix of per-query sums
+    """
+    totals = np.zeros(shape)
+    if len(query_indices) == 0:
+        return totals
+    order = np.argsort(query_indices, kind="stable")
+    sorted_queries = query_indices[order]
+    starts = np.flatnonzero(np.r_[True, sorted_queries[1:] != sorted_queries[:-1]])
+    totals[sorted_queries[starts]] = np.add.reduceat(rows[order], starts, axis=0)
+    return totals
+
+# Function to score a batch of queries against every legal domain
+def domain_strength_matrix(queries, vocabulary=DOMAIN_VOCABULARY):
+    """
+    Computes the domain match strength of every query, equal to what
+    identify_query_domains returns for each query on its own
+
+    Args:
+        queries (list): Search queries
+        vocabulary (DomainVocabulary): Compiled domain terms
+
+    Returns:
+        np.ndarray: float64 matrix with one row per query and one column per domain in
+                    vocabulary.domain_names order (0.0 where a domain is not matched)
+    """
+    lower_queries = [query.lower() for query in queries]
+    shape = (len(lower_queries), len(vocabulary.domain_names))
+    if not lower_queries:
+        return np.zeros(shape)
+
+    # Number of matched terms (and multi-word terms) per query and domain
+    query_indices, term_indices = pattern_incidence(lower_queries, vocabulary.terms)
+    hits = sum_rows_by_query(query_indices, vocabulary.term_domain_counts[term_indices], shape)
+    multiword = sum_rows_by_query(query_indices, vocabulary.term_domain_multiword[term_indices], shape)
+
+    strengths = np.minimum(0.9, 0.3 + (hits / vocabulary.domain_term_totals) * 0.6)
+    strengths += np.minimum(0.1, multiword * 0.05)
+    strengths[hits == 0] = 0.0
+
+    # A query naming the domain directly is a full-strength match
+    query_indices, domain_indices = pattern_incidence(lower_queries, vocabulary.domain_patterns)
+    strengths[query_indices, domain_indices] = 1.0
+
+    return strengths
+
+# Function to identify the domains of many queries at once
+def identify_query_domains_batch(queries, vocabulary=DOMAIN_VOCABULARY):
+    """
+    Batched identify_query_domains
+
+    Args:
+        queries (list): Search queries
+
+    Returns:
+        list: One dict per query mapping matched domain names to strengths
+    """
+    strengths = domain_strength_matrix(queries, vocabulary)
+    names = vocabulary.domain_names
+    return [
+        {names[column]: float(row[column]) for column in np.flatnonzero(row)}
+        for row in strengths
+    ]
@@ -0,0 +1,198 @@
+# Profile Facets
+# This file extracts filterable facets (jurisdiction, location, languages, ...)
+# from the lawyer bios and keeps them as boolean-array indexes for fast filtering
+
+import re
+
+import numpy as np
+
+# Facets exposed for filtering, mapped to their display labels
+FACET_FIELDS = {
+    "jurisdiction": "Jurisdiction",
+    "location": "Location",
+    "languages": "Languages",
+    "level": "Level/Title",
+    "call": "Year of Call",
+    "industry_experience": "Industry Experience"
+}
+
+# Separators used inside multi-valued bio fields ("Ontario, Quebec", "English\nFrench",
+# "British Columbia            Washington", "English & French")
+MULTI_VALUE_SPLIT = re.compile(r"\s*(?:[,;\n/&]|\s{2,})\s*")
+
+# Industry names contain "&" and "/" themselves ("Oil & Gas", "Banking/Financial Services")
+INDUSTRY_SPLIT = re.compile(r"\s*[,;\n]\s*")
+
+# Abbreviations and typos that should collapse onto a single facet value
+FACET_ALIASES = {
+    "on": "Ontario",
+    "bc": "British Columbia",
+    "british columia": "British Columbia",
+    "ab": "Alberta",
+    "qc": "Quebec",
+    "sk": "Saskatchewan",
+    "mb": "Manitoba",
+    "ny": "New York",
+    "caymans": "Cayman Islands",
+    "hindu": "Hindi"
+}
+
+# Facets whose raw value is a single label rather than a list
+SINGLE_VALUE_FACETS = {"level"}
+
+# Values listed with their live counts under each facet filter
+FACET_COUNTS_SHOWN = 6
+
+# Function to build the comparison key for a facet value
+def normalise_facet_key(value):
+    """
+    Normalises a facet value for comparison so that spelling variants collapse
+    ("E-commerce", "Ecommerce", "E-Commerce" all share one key, as do "Oil & Gas"
+    and "Oil and Gas")
+
+    Args:
+        value (str): Raw facet value
+
+    Returns:
+        str: Lowercase key with "&" read as "and" and punctuation and whitespace removed
+    """
+    return re.sub(r"[^0-9a-z]+", "", value.lower().replace("&", "and"))
+
+# Function to split a raw bio field into clean facet values
+def extract_facet_values(facet, raw_value):
+    """
+    Extracts the normalised values of one facet from a raw bio field
+
+    Args:
+        facet (str): Facet name (one of FACET_FIELDS)
+        raw_value (str): Raw bio field text
+
+    Returns:
+        list: Display values for this facet, without duplicates
+    """
+    # Zero-width and non-breaking spaces come through from the spreadsheet export
+    text = (raw_value or "").replace("\u200b", "").replace("\xa0", " ").strip()
+    if not text:
+        return []
+
+    if facet == "call":
+        # Bucket by decade of the earliest call to the bar
+        years = [int(year) for year in re.findall(r"\b(19\d{2}|20\d{2})\b", text)]
+        return [f"{min(years) // 10 * 10}s"] if years else []
+
+    if facet in SINGLE_VALUE_FACETS:
+        parts = [text]
+    elif facet == "industry_experience":
+        parts = INDUSTRY_SPLIT.split(text)
+    else:
+        parts = MULTI_VALUE_SPLIT.split(text)
+
+    values = []
+    seen = set()
+    for part in parts:
+        part = part.strip(" .")
+        if not part:
+            continue
+        part = FACET_ALIASES.get(part.lower(), part)
+        key = normalise_facet_key(part)
+        if key and key not in seen:
+            seen.add(key)
+            values.append(part)
+
+    return values
+
+# Function to build the per-facet boolean-array indexes for a roster
+def build_facet_index(lawyers):
+    """
+    Builds one boolean array per facet value, aligned with the lawyers list
+
+    Args:
+        lawyers (list): Lawyer profiles with attached bio data
+
+    Returns:
+        dict: Facet name mapped to {"labels": {value: label}, "bitmaps": {value: np.ndarray},
+              "counts": {value: int}}, plus the roster size under "size"
+    """
+    size = len(lawyers)
+    index = {"size": size}
+
+    for facet in FACET_FIELDS:
+        labels = {}
+        positions = {}
+
+        for position, lawyer in enumerate(lawyers):
+            bio = lawyer.get('bio') or {}
+            for value in extract_facet_values(facet, bio.get(facet, "")):
+                key = normalise_facet_key(value)
+                # Keep the first spelling we see as the display label
+                labels.setdefault(key, value)
+                positions.setdefault(key, []).append(position)
+
+        bitmaps = {}
+        for key, rows in positions.items():
+            bitmap = np.zeros(size, dtype=bool)
+            bitmap[rows] = True
+            bitmaps[key] = bitmap
+
+        index[facet] = {
+            "labels": labels,
+            "bitmaps": bitmaps,
+            "counts": {key: int(bitmap.sum()) for key, bitmap in bitmaps.items()}
+        }
+
+    return index
+
+# Function to turn facet selections into a lawyer mask
+def facet_filter_mask(facet_index, facet_filters, skip_facet=None):
+    """
+    Intersects the facet bitmaps for the selected values. Values within a facet are
+    OR-ed together, and different facets are AND-ed.
+
+    Args:
+        facet_index (dict): Index returned by build_facet_index
+        facet_filters (dict): Facet name mapped to a list of selected values
+        skip_facet (str): Facet to leave out of the intersection (used for counts)
+
+    Returns:
+        np.ndarray: Boolean mask over the lawyers list, or None if nothing is selected
+    """
+    mask = None
+
+    for facet, selected in (facet_filters or {}).items():
+        if facet == skip_facet or not selected or facet not in facet_index:
+            continue
+
+        bitmaps = facet_index[facet]["bitmaps"]
+        facet_mask = np.zeros(facet_index["size"], dtype=bool)
+        for value in selected:
+            bitmap = bitmaps.get(normalise_facet_key(value))
+            if bitmap is not None:
+                facet_mask |= bitmap
+
+        mask = facet_mask if mask is None else mask & facet_mask
+
+    return mask
+
+# Function to count facet values under the current selections
+def facet_value_counts(facet_index, facet, facet_filters=None):
+    """
+    Counts the lawyers carrying each value of a facet, restricted by the selections
+    made on the other facets
+
+    Args:
+        facet_index (dict): Index returned by build_facet_index
+        facet (str): Facet to count
+        facet_filters (dict): Current facet selections
+
+    Returns:
+        list: (label, count) pairs sorted by descending count
+    """
+    mask = facet_filter_mask(facet_index, facet_filters, skip_facet=facet)
+    facet_data = facet_index[facet]
+
+    counts = []
+    for key, bitmap in facet_data["bitmaps"].items():
+        count = facet_data["counts"][key] if mask is None else int(np.count_nonzero(bitmap & mask))
+        counts.append((facet_data["labels"][key], count))
+
+    return sorted(counts, key=lambda x: (-x[1], x[0]))
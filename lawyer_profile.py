@@ -0,0 +1,274 @@
+# Compact Lawyer Profiles
+# This file defines slotted, read-only profile records that behave like the profile
+# dicts the rest of the app reads, while storing skills as indices into the shared
+# skill vocabulary and interning repeated strings
+
+import sys
+from array import array
+from collections.abc import Mapping
+
+# Profile fields, in the order the profile dicts were built with
+PROFILE_FIELDS = (
+    'name', 'email', 'skills', 'availability', 'days_available', 'hours_available',
+    'vacation', 'engagement_note', 'practice_area', 'billable_rate', 'last_client', 'bio'
+)
+
+# Bio fields, in the order process_bio_data builds them
+BIO_FIELDS = (
+    'level', 'call', 'jurisdiction', 'location', 'practice_areas', 'industry_experience',
+    'languages', 'previous_in_house', 'previous_firms', 'education', 'awards',
+    'notable_items', 'expert'
+)
+
+# Shorthand for interning a string value (numpy strings become plain str first);
+# other values are returned unchanged
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(str(value))
+    return value
+
+# Class holding the skill vocabulary shared by every profile of a roster
+class SkillVocabulary:
+    """
+    Skill names and their column positions (the skill matrix column order)
+    """
+
+    __slots__ = ('skills', 'columns')
+
+    def __init__(self, unique_skills):
+        self.skills = [_intern(skill) for skill in unique_skills]
+        self.columns = {skill: column for column, skill in enumerate(self.skills)}
+
+# Class holding one lawyer's skill points
+class SkillVector(Mapping):
+    """
+    Read-only skill name -> points mapping stored as vocabulary ids and values,
+    iterating in the lawyer's own skill order. Points are whole numbers held as
+    unsigned bytes (as in the skill matrix) and read back as floats, as the profile
+    dicts held them.
+    """
+
+    __slots__ = ('_vocabulary', '_ids', '_values', '_top')
+
+    def __init__(self, vocabulary, ids, values):
+        self._vocabulary = vocabulary
+        self._ids = array('i', ids)
+        self._values = array('B', (int(value) for value in values))
+        # Positions by descending points (ties keep the lawyer's order), sorted once
+        # so top-skill lists are slices
+        self._top = array('i', sorted(range(len(self._values)), key=lambda position: -self._values[position]))
+
+    @classmethod
+    def from_dict(cls, skills, vocabulary):
+        return cls(vocabulary, [vocabulary.columns[skill] for skill in skills], skills.values())
+
+    @property
+    def ids(self):
+        """Vocabulary ids of the skills, in the lawyer's order"""
+        return self._ids
+
+    @property
+    def values_array(self):
+        """Skill points (unsigned bytes), aligned with ids"""
+        return self._values
+
+    @property
+    def top_positions(self):
+        """Positions (into ids and values) ordered by descending points"""
+        return self._top
+
+    def entry(self, position):
+        """Returns the (skill, points) pair at a position of the lawyer's order"""
+        return self._vocabulary.skills[self._ids[position]], float(self._values[position])
+
+    def top(self, limit=None):
+        """
+        Returns the lawyer's highest-scoring skills
+
+        Args:
+            limit (int): Number of skills (all when None)
+
+        Returns:
+            list: (skill, points) pairs by descending points
+        """
+        return [self.entry(position) for position in self._top[:limit]]
+
+    def __getitem__(self, skill):
+        column = self._vocabulary.columns.get(skill)
+        if column is not None:
+            for position, skill_id in enumerate(self._ids):
+                if skill_id == column:
+                    return float(self._values[position])
+        raise KeyError(skill)
+
+    def __iter__(self):
+        skills = self._vocabulary.skills
+        return (skills[skill_id] for skill_id in self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def items(self):
+        skills = self._vocabulary.skills
+        return [(skills[skill_id], float(value)) for skill_id, value in zip(self._ids, self._values)]
+
+    def __repr__(self):
+        return f"SkillVector({dict(self.items())!r})"
+
+# Class holding one lawyer's biographical fields
+class BioRecord(Mapping):
+    """
+    Read-only bio mapping with one slot per field. Fields missing from the source
+    are absent from the mapping, as they were from the dict.
+    """
+
+    __slots__ = BIO_FIELDS
+
+    def __init__(self, bio):
+        for field in BIO_FIELDS:
+            setattr(self, field, _intern(bio.get(field)))
+
+    def __getitem__(self, field):
+        value = getattr(self, field, None) if field in BIO_FIELDS else None
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        return (field for field in BIO_FIELDS if getattr(self, field) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"BioRecord({dict(self)!r})"
+
+# Bio shared by every lawyer without a matching bio row
+EMPTY_BIO = BioRecord({field: '' for field in BIO_FIELDS})
+
+# Class reading one lawyer's bio from a memory-mapped bio table
+class LazyBioRecord(Mapping):
+    """
+    Read-only bio mapping backed by a row of a published bio table (see
+    roster_store.BioTable). Field text stays on disk until it is read, so only the
+    lawyers that are displayed or sent to the LLM ever have their bio decoded.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field):
+        value = self._table.text(self._row, field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        return iter(self._table.row_fields(self._row))
+
+    def __len__(self):
+        return len(self._table.row_fields(self._row))
+
+    def __repr__(self):
+        return f"LazyBioRecord(row={self._row})"
+
+# Class holding one lawyer profile
+class LawyerProfile(Mapping):
+    """
+    Read-only lawyer profile with one slot per field, readable like the profile dicts
+    (profile['name'], profile.get('bio'), profile['skills'].items(), ...)
+    """
+
+    __slots__ = PROFILE_FIELDS
+
+    def __init__(self, name, email, skills, availability, days_available, hours_available,
+                 vacation, engagement_note, practice_area, billable_rate, last_client, bio):
+        self.name = _intern(name)
+        self.email = _intern(email)
+        self.skills = skills
+        self.availability = _intern(availability)
+        self.days_available = days_available
+        self.hours_available = _intern(hours_available)
+        if isinstance(vacation, str):
+            vacation = [vacation] if vacation else []
+        self.vacation = tuple(_intern(dates) for dates in vacation)
+        self.engagement_note = _intern(engagement_note)
+        self.practice_area = _intern(practice_area)
+        self.billable_rate = _intern(billable_rate)
+        self.last_client = _intern(last_client)
+        self.bio = bio
+
+    def __getitem__(self, field):
+        if field not in PROFILE_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(PROFILE_FIELDS)
+
+    def __len__(self):
+        return len(PROFILE_FIELDS)
+
+    def __repr__(self):
+        return f"LawyerProfile(name={self.name!r})"
+
+# Function to convert a bio dict, sharing records between identical sources
+def make_bio_record(bio, shared=None):
+    """
+    Returns the compact record for a bio dict
+
+    Args:
+        bio (dict): Bio fields (or None)
+        shared (dict): Optional cache of records already built, keyed by field values
+
+    Returns:
+        BioRecord: The record (EMPTY_BIO when every field is empty)
+    """
+    if isinstance(bio, (BioRecord, LazyBioRecord)):
+        return bio
+    bio = bio or {}
+    key = tuple(bio.get(field) for field in BIO_FIELDS)
+    if all(not value for value in key) and len(bio) == len(BIO_FIELDS):
+        return EMPTY_BIO
+    if shared is None:
+        return BioRecord(bio)
+    record = shared.get(key)
+    if record is None:
+        record = shared[key] = BioRecord(bio)
+    return record
+
+# Function to convert the processed profile dicts into compact profiles
+def build_lawyer_profiles(lawyers, unique_skills):
+    """
+    Converts profile dicts into LawyerProfile records sharing one skill vocabulary
+
+    Args:
+        lawyers (list): Profile dicts from process_lawyer_data / combine_lawyer_data
+        unique_skills (list): Skill vocabulary, in skill matrix column order
+
+    Returns:
+        list: LawyerProfile records, in the same order
+    """
+    vocabulary = SkillVocabulary(unique_skills)
+    shared_bios = {}
+
+    return [
+        LawyerProfile(
+            name=lawyer['name'],
+            email=lawyer['email'],
+            skills=SkillVector.from_dict(lawyer['skills'], vocabulary),
+            availability=lawyer['availability'],
+            days_available=lawyer['days_available'],
+            hours_available=lawyer['hours_available'],
+            vacation=lawyer['vacation'],
+            engagement_note=lawyer['engagement_note'],
+            practice_area=lawyer['practice_area'],
+            billable_rate=lawyer['billable_rate'],
+            last_client=lawyer['last_client'],
+            bio=make_bio_record(lawyer.get('bio'), shared_bios)
+        )
+        for lawyer in lawyers
+    ]
@@ -1,6 +1,10 @@
 # Legal Domains Knowledge Base
 # This file contains the domain expertise definitions for better matching
 
+import numpy as np
+
+from facets import facet_filter_mask
+
 # Define legal domains and related terms/keywords for each domain
 LEGAL_DOMAINS = {
     "Administrative Law": [
@@ -386,8 +390,32 @@ def evaluate_domain_expertise(lawyer_skills, query_domains):
         "has_specific_domain_expertise": has_specific_domain_expertise
     }
 
+# Function to narrow the roster to active lawyers matching the selected facets
+def filter_eligible_lawyers(data, facet_filters):
+    """
+    Applies the active-lawyer mask (see roster_status.py) and the facet selections
+    to the roster using the precomputed boolean masks
+    
+    Args:
+        data (dict): The lawyer data structure
+        facet_filters (dict): Facet name mapped to a list of selected values
+        
+    Returns:
+        list: Active lawyers passing every facet filter
+    """
+    mask = data.get('active_mask')
+    if facet_filters and 'facet_index' in data:
+        facet_mask = facet_filter_mask(data['facet_index'], facet_filters)
+        if facet_mask is not None:
+            mask = facet_mask if mask is None else mask & facet_mask
+    
+    lawyers = data['lawyers']
+    if mask is None:
+        return lawyers
+    return [lawyers[i] for i in np.flatnonzero(mask)]
+
 # Main function to match lawyers to a query based on legal domain expertise
-def match_lawyers_with_domain_expertise(data, query, top_n=5):
+def match_lawyers_with_domain_expertise(data, query, top_n=5, facet_filters=None):
     """
     Matches lawyers to a query with emphasis on specific legal domain expertise
     
@@ -395,6 +423,7 @@ def match_lawyers_with_domain_expertise(data, query, top_n=5):
         data (dict): The lawyer data structure
         query (str): The search query
         top_n (int): Number of top matches to return
+        facet_filters (dict): Optional facet selections (see facets.py) applied before scoring
         
     Returns:
         list: Top N lawyer matches with scores and match details
@@ -407,17 +436,12 @@ def match_lawyers_with_domain_expertise(data, query, top_n=5):
     
     # If no domains were identified, fall back to keyword matching
     if not query_domains:
-        return fallback_keyword_matching(data, query, top_n)
+        return fallback_keyword_matching(data, query, top_n, facet_filters)
     
     # Calculate match scores for each lawyer
     matches = []
-    excluded_users = ["Ankita", "Test", "Tania"]
     
-    for lawyer in data['lawyers']:
-        # Skip test users
-        if any(excluded_name in lawyer['name'] for excluded_name in excluded_users):
-            continue
-            
+    for lawyer in filter_eligible_lawyers(data, facet_filters):
         # Evaluate how well this lawyer's skills match the required domains
         expertise_evaluation = evaluate_domain_expertise(lawyer['skills'], query_domains)
         score = expertise_evaluation["total_score"]
@@ -452,7 +476,7 @@ def match_lawyers_with_domain_expertise(data, query, top_n=5):
     return sorted(matches, key=lambda x: x['score'], reverse=True)[:top_n]
 
 # Fallback method for when no domains are matched
-def fallback_keyword_matching(data, query, top_n=5):
+def fallback_keyword_matching(data, query, top_n=5, facet_filters=None):
     """
     Fallback method when no domains match - uses simple keyword matching
     
@@ -460,6 +484,7 @@ def fallback_keyword_matching(data, query, top_n=5):
         data (dict): The lawyer data structure
         query (str): The search query
         top_n (int): Number of top matches to return
+        facet_filters (dict): Optional facet selections (see facets.py) applied before scoring
         
     Returns:
         list: Top N lawyer matches with scores and match details
@@ -467,14 +492,9 @@ def fallback_keyword_matching(data, query, top_n=5):
     # Basic implementation - could be expanded
     lower_query = query.lower()
     query_words = set(lower_query.split())
-    excluded_users = ["Ankita", "Test", "Tania"]
     
     matches = []
-    for lawyer in data['lawyers']:
-        # Skip test users
-        if any(excluded_name in lawyer['name'] for excluded_name in excluded_users):
-            continue
-            
+    for lawyer in filter_eligible_lawyers(data, facet_filters):
         score = 0
         matched_skills = []
         
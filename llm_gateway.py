@@ -0,0 +1,144 @@
+# LLM Request Gateway
+# This file runs every rationale request through one process-wide asyncio loop that
+# coalesces identical in-flight requests and enforces global concurrency and rate limits
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+
+from claude_client import build_rationale_payload, fetch_rationales
+
+# Global limits, shared by every Streamlit session in the process
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "50"))
+
+# Class coalescing and rate limiting upstream rationale requests
+class RationaleGateway:
+    """
+    Single-flight gateway in front of the Claude API. Identical prompts requested while
+    one is already in flight share its result; upstream calls are limited to
+    max_concurrency at a time and requests_per_minute overall (token bucket).
+
+    Args:
+        max_concurrency (int): Maximum simultaneous upstream requests
+        requests_per_minute (float): Sustained upstream request rate
+        fetch (callable): Function (prompt, api_key) -> rationale dict doing the upstream call
+    """
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, requests_per_minute=LLM_REQUESTS_PER_MINUTE, fetch=fetch_rationales):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._fetch = fetch
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loop = None
+        self._executor = None
+        # The attributes below are only touched from the gateway's loop thread
+        self._in_flight = {}
+        self._semaphore = None
+        self._tokens = 1.0
+        self._last_refill = None
+        self.upstream_calls = 0
+        self.coalesced_requests = 0
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="llm-upstream"
+                )
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True).start()
+        return self._loop
+
+    async def _acquire_rate_slot(self):
+        # Token bucket refilled continuously at requests_per_minute, holding up to one
+        # burst of max_concurrency requests
+        rate = self.requests_per_minute / 60.0
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self._last_refill is not None:
+                self._tokens = min(float(self.max_concurrency), self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / rate)
+
+    async def _call_upstream(self, prompt, api_key):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            await self._acquire_rate_slot()
+            with self._stats_lock:
+                self.upstream_calls += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._fetch, prompt, api_key)
+
+    async def _request(self, key, prompt, api_key):
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            with self._stats_lock:
+                self.coalesced_requests += 1
+            # Shield so one waiter giving up does not cancel the shared request
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(self._call_upstream(prompt, api_key))
+        self._in_flight[key] = flight
+        flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(flight)
+
+    def submit(self, prompt, api_key):
+        """
+        Submits a rationale request without waiting for it
+
+        Args:
+            prompt (dict or str): Prompt parts or plain prompt string
+            api_key (str): Anthropic API key
+
+        Returns:
+            concurrent.futures.Future: Resolves to the rationale dict
+        """
+        loop = self._ensure_started()
+        payload = json.dumps(build_rationale_payload(prompt), sort_keys=True)
+        key = hashlib.sha256(payload.encode()).hexdigest()
+        return asyncio.run_coroutine_threadsafe(self._request(key, prompt, api_key), loop)
+
+    def fetch(self, prompt, api_key, timeout=None):
+        """
+        Requests the rationales for a prompt, joining an identical in-flight request
+        when there is one
+
+        Args:
+            prompt (dict or str): Prompt parts or plain prompt string
+            api_key (str): Anthropic API key
+            timeout (float): Seconds to wait before raising concurrent.futures.TimeoutError
+                             (the shared request keeps running for other waiters)
+
+        Returns:
+            dict: Lawyer names mapped to rationales, or {"error": message}
+        """
+        # Each waiter gets its own copy of the fanned-out result
+        return dict(self.submit(prompt, api_key).result(timeout))
+
+    def stats(self):
+        """
+        Returns the gateway counters
+
+        Returns:
+            dict: Upstream calls made, requests served by joining an in-flight call,
+                  and the number of calls currently in flight
+        """
+        with self._stats_lock:
+            return {
+                "upstream_calls": self.upstream_calls,
+                "coalesced_requests": self.coalesced_requests,
+                "in_flight": len(self._in_flight)
+            }
+
+# Process-wide gateway shared by all sessions
+RATIONALE_GATEWAY = RationaleGateway()
@@ -1,14 +1,30 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import os
 import anthropic
 import re
-import json
-from functools import lru_cache
+import concurrent.futures
 
 # Import the domain expertise functions from legal_domains.py
-from legal_domains import match_lawyers_with_domain_expertise, LEGAL_DOMAINS, identify_query_domains
+from legal_domains import LEGAL_DOMAINS, identify_query_domains
+from batch_ranking import rank_lawyers_batch
+from facets import FACET_COUNTS_SHOWN, FACET_FIELDS, build_facet_index, facet_value_counts
+from result_cache import SEARCH_RESULT_CACHE, make_search_cache_key
+from roster_version import compute_roster_version, roster_sources
+from roster_stats import get_roster_stats
+from roster_ingest import csr_to_dense, process_bio_data, read_bio_chunks, read_skill_survey
+from lawyer_profile import EMPTY_BIO, build_lawyer_profiles
+from term_index import get_term_index
+from typeahead import get_typeahead_index
+from similar_lawyers import get_similarity_index, similar_lawyer_matches
+from roster_status import build_active_mask
+from roster_store import ROSTER_STORE_DIR, attach_roster, publish_roster
+from card_renderer import paginate, render_lawyer_cards
+from prompt_builder import build_rationale_prompt_parts
+from claude_client import PROMPT_CACHE_STATS
+from llm_gateway import RATIONALE_GATEWAY
+from sharded_scoring import SCORING_WORKERS, rank_lawyers_sharded
+from offline_rationale import RATIONALE_MODE, RATIONALE_TIMEOUT_SECONDS, generate_offline_rationales
 
 # Page Configuration
 st.set_page_config(
@@ -165,63 +181,54 @@ h1 {
 </style>
 """, unsafe_allow_html=True)
 
-# Function to load and process the CSV data (same as before)
-@lru_cache(maxsize=1)
-def load_lawyer_data():
-    try:
-        # Load the skills data
-        skills_df = pd.read_csv('combined_unique.csv')
-        skills_data = process_lawyer_data(skills_df)
-        
-        # Load the biographical data
-        bio_df = pd.read_csv('BD_Caravel.csv')
-        bio_data = process_bio_data(bio_df)
-        
-        # Combine the data
-        combined_data = combine_lawyer_data(skills_data, bio_data)
-        
-        return combined_data
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None
-
-# Function to process the biographical data (same as before)
-def process_bio_data(df):
-    # [This function remains the same]
-    lawyers_bio = {}
+# Function to load and process the CSV data, cached per roster version so that
+# reruns and other sessions reuse the processed roster until the files change. Only
+# the current version is kept, and a failed load raises, so it is not cached and the
+# next run retries it
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_lawyer_data(roster_version):
+    # Attach to the roster another server process already published, if any
+    if ROSTER_STORE_DIR:
+        published_data = attach_roster(roster_version)
+        if published_data is not None:
+            return published_data
     
-    for _, row in df.iterrows():
-        # Convert first and last names to string and handle NaN values
-        first_name = str(row['First Name']).strip() if pd.notna(row['First Name']) else ""
-        last_name = str(row['Last Name']).strip() if pd.notna(row['Last Name']) else ""
-        
-        full_name = f"{first_name} {last_name}".strip()
-        
-        # Skip empty names
-        if not full_name:
-            continue
-        
-        bio = {
-            'level': str(row['Level/Title']) if pd.notna(row['Level/Title']) else "",
-            'call': str(row['Call']) if pd.notna(row['Call']) else "",
-            'jurisdiction': str(row['Jurisdiction']) if pd.notna(row['Jurisdiction']) else "",
-            'location': str(row['Location']) if pd.notna(row['Location']) else "",
-            'practice_areas': str(row['Area of Practise + Add Info']) if pd.notna(row['Area of Practise + Add Info']) else "",
-            'industry_experience': str(row['Industry Experience']) if pd.notna(row['Industry Experience']) else "",
-            'languages': str(row['Languages']) if pd.notna(row['Languages']) else "",
-            'previous_in_house': str(row['Previous In-House Companies']) if pd.notna(row['Previous In-House Companies']) else "",
-            'previous_firms': str(row['Previous Companies/Firms']) if pd.notna(row['Previous Companies/Firms']) else "",
-            'education': str(row['Education']) if pd.notna(row['Education']) else "",
-            'awards': str(row['Awards/Recognition']) if pd.notna(row['Awards/Recognition']) else "",
-            'notable_items': str(row['Notable Items/Personal Details ']) if pd.notna(row['Notable Items/Personal Details ']) else "",
-            'expert': str(row['Expert']) if pd.notna(row['Expert']) else ""
-        }
-        
-        lawyers_bio[full_name] = bio
+    # Parquet sources when converted, otherwise the CSVs
+    skills_source, bio_source = roster_sources()
     
-    return {
-        'lawyers_bio': lawyers_bio
-    }
+    # Load the skills data, streamed in typed chunks into a sparse skill matrix
+    skills_data = process_lawyer_data(read_skill_survey(skills_source))
+    
+    # Load the biographical data
+    bio_data = process_bio_data(read_bio_chunks(bio_source))
+    
+    # Combine the data
+    combined_data = combine_lawyer_data(skills_data, bio_data)
+    
+    # Store the profiles as compact records sharing the skill vocabulary
+    combined_data['lawyers'] = build_lawyer_profiles(combined_data['lawyers'], combined_data['unique_skills'])
+    
+    # Index the bio facets once so filtering is a bitmap intersection
+    combined_data['facet_index'] = build_facet_index(combined_data['lawyers'])
+    # Dense uint8 matrix for scoring; the full roster is materialised here
+    combined_data['skill_matrix'] = csr_to_dense(skills_data['skill_csr'])
+    # Test and inactive users listed in the roster status file are never matched
+    combined_data['active_mask'] = build_active_mask(combined_data['lawyers'])
+    combined_data['roster_version'] = roster_version
+    
+    # Publish for the other processes, then serve this one from the published
+    # files too so bio text stays on disk until it is displayed
+    if ROSTER_STORE_DIR:
+        try:
+            publish_roster(combined_data)
+        except OSError:
+            pass
+        else:
+            published_data = attach_roster(roster_version)
+            if published_data is not None:
+                return published_data
+    
+    return combined_data
 
 # Function to combine skills and biographical data (same as before)
 def combine_lawyer_data(skills_data, bio_data):
@@ -250,25 +257,8 @@ def combine_lawyer_data(skills_data, bio_data):
                     bio = bio_info
                     break
         
-        # Add biographical data if found
-        if bio:
-            lawyer['bio'] = bio
-        else:
-            lawyer['bio'] = {
-                'level': '',
-                'call': '',
-                'jurisdiction': '',
-                'location': '',
-                'practice_areas': '',
-                'industry_experience': '',
-                'languages': '',
-                'previous_in_house': '',
-                'previous_firms': '',
-                'education': '',
-                'awards': '',
-                'notable_items': '',
-                'expert': ''
-            }
+        # Add biographical data if found; unmatched lawyers share one empty bio
+        lawyer['bio'] = bio if bio else EMPTY_BIO
         
         combined_lawyers.append(lawyer)
     
@@ -278,41 +268,23 @@ def combine_lawyer_data(skills_data, bio_data):
         'unique_skills': skills_data['unique_skills']
     }
 
-def process_lawyer_data(df):
-    # Get all skill columns
-    skill_columns = [col for col in df.columns if '(Skill' in col]
-    
-    # Create a map of normalized skill names
-    skill_map = {}
-    for col in skill_columns:
-        match = re.match(r'(.*) \(Skill \d+\)', col)
-        if match:
-            skill_name = match.group(1)
-            if skill_name not in skill_map:
-                skill_map[skill_name] = []
-            skill_map[skill_name].append(col)
-    
-    # Function to get max skill value across duplicate columns
-    def get_max_skill_value(lawyer_row, skill_name):
-        columns = skill_map.get(skill_name, [])
-        values = [lawyer_row[col] for col in columns if pd.notna(lawyer_row[col])]
-        return max(values) if values else 0
+def process_lawyer_data(survey):
+    # Canonical skills and the sparse skill points from read_skill_survey
+    skill_map = survey['skill_map']
+    unique_skills = survey['unique_skills']
+    skill_csr = survey['skill_csr']
     
     # Create lawyer profiles with real availability data and some demo data
     lawyers = []
     practice_areas = ["Corporate", "Litigation", "IP", "Employment", "Privacy", "Finance", "Real Estate", "Tax"]
     rate_ranges = ["$400-500/hr", "$500-600/hr", "$600-700/hr", "$700-800/hr", "$800-900/hr"]
     
-    # Real availability data from the provided information
-    availability_data = get_lawyer_availability()
-    
-    for _, row in df.iterrows():
-        lawyer_name = row['Submitter Name']
+    for row, (lawyer_name, email) in enumerate(zip(survey['names'], survey['emails'])):
         availability_info = get_availability_for_lawyer(lawyer_name)
         
         profile = {
             'name': lawyer_name,
-            'email': row['Submitter Email'],
+            'email': email,
             'skills': {},
             # Use real availability data when available
             'availability': availability_info.get('status', 'Status Unknown'),
@@ -326,21 +298,22 @@ def process_lawyer_data(df):
             'last_client': f"Client {np.random.randint(100, 999)}"
         }
         
-        # Extract skills with non-zero values
-        for skill_name in skill_map:
-            value = get_max_skill_value(row, skill_name)
-            if value > 0:
-                profile['skills'][skill_name] = value
+        # Skills with non-zero values, in skill vocabulary order
+        start, end = skill_csr['indptr'][row], skill_csr['indptr'][row + 1]
+        for column, value in zip(skill_csr['indices'][start:end], skill_csr['data'][start:end]):
+            profile['skills'][unique_skills[column]] = float(value)
         
         lawyers.append(profile)
     
     return {
         'lawyers': lawyers,
         'skill_map': skill_map,
-        'unique_skills': list(skill_map.keys())
+        'unique_skills': unique_skills,
+        'skill_csr': skill_csr
     }
 
 # All the availability-related functions remain the same
+
 def get_lawyer_availability():
     # Real availability data parsed from the provided information
     days_available = parse_days_availability()
@@ -758,171 +731,44 @@ def parse_engagement_notes():
     
     return result
 
-# Function to get top skills for a lawyer (same as before)
-def get_top_skills(lawyer, limit=5):
-    return sorted(
-        [{'skill': skill, 'value': value} for skill, value in lawyer['skills'].items()],
-        key=lambda x: x['value'],
-        reverse=True
-    )[:limit]
-
 # NEW: Updated match_lawyers function that uses the legal_domains.py module
-def match_lawyers(data, query, top_n=5):
+def match_lawyers(data, query, top_n=5, facet_filters=None):
     """
     Matches lawyers to a query using domain-specific legal expertise
     """
-    # Use the enhanced domain-based matching algorithm imported from legal_domains.py
-    return match_lawyers_with_domain_expertise(data, query, top_n)
-
-# Function to format Claude's analysis prompt (updated to include domain information)
-def format_claude_prompt(query, matches):
-    prompt = f"""
-I need to analyze and provide detailed reasoning for why specific lawyers match a client's legal needs based on their expertise, skills, and background.
-
-Client's Legal Need: "{query}"
-
-Here are the matching lawyers with their skills and biographical information:
-
-"""
+    # Optional sharded mode for very large rosters (SCORING_WORKERS > 0)
+    if SCORING_WORKERS > 0:
+        return rank_lawyers_sharded(data, [query], top_n, facet_filters)[0]
     
-    for i, match in enumerate(matches, 1):
-        lawyer = match['lawyer']
-        skills = match['matched_skills']
-        bio = lawyer['bio']
-        
-        prompt += f"LAWYER {i}: {lawyer['name']}\n"
-        prompt += "---------------------------------------------\n"
-        
-        # Add skills information
-        prompt += "RELEVANT SKILLS:\n"
-        for skill in skills:
-            prompt += f"- {skill['skill']}: {skill['value']} points\n"
-        
-        # Add domain information if available
-        if 'matched_domains' in match and match['matched_domains']:
-            prompt += "\nMATCHED LEGAL DOMAINS:\n"
-            for domain in match['matched_domains']:
-                prompt += f"- {domain}\n"
-        
-        # Add biographical information
-        prompt += "\nBIOGRAPHICAL INFORMATION:\n"
-        if bio['level']:
-            prompt += f"- Level/Title: {bio['level']}\n"
-        if bio['call']:
-            prompt += f"- Called to Bar: {bio['call']}\n"
-        if bio['jurisdiction']:
-            prompt += f"- Jurisdiction: {bio['jurisdiction']}\n"
-        if bio['location']:
-            prompt += f"- Location: {bio['location']}\n"
-        if bio['practice_areas']:
-            prompt += f"- Practice Areas: {bio['practice_areas']}\n"
-        if bio['industry_experience']:
-            prompt += f"- Industry Experience: {bio['industry_experience']}\n"
-        if bio['previous_in_house']:
-            prompt += f"- Previous In-House Experience: {bio['previous_in_house']}\n"
-        if bio['previous_firms']:
-            prompt += f"- Previous Law Firms: {bio['previous_firms']}\n"
-        if bio['education']:
-            prompt += f"- Education: {bio['education']}\n"
-        if bio['awards']:
-            prompt += f"- Awards/Recognition: {bio['awards']}\n"
-        if bio['expert']:
-            prompt += f"- Areas of Expertise: {bio['expert']}\n"
-        if bio['notable_items']:
-            prompt += f"- Notable Experience: {bio['notable_items']}\n"
-            
-        # Add availability information
-        prompt += f"\nAVAILABILITY: {lawyer['availability']}\n"
-        if lawyer['days_available'] is not None:
-            prompt += f"Days available: {lawyer['days_available']}\n"
-        if lawyer['hours_available'] is not None:
-            prompt += f"Hours available: {lawyer['hours_available']}\n"
-        if lawyer['engagement_note']:
-            prompt += f"Current engagement: {lawyer['engagement_note']}\n"
-            
-        prompt += "\n\n"
-    
-    prompt += """
-For each lawyer, provide a DETAILED explanation (at least 3-4 sentences) of why they would be an excellent match for this client need. Focus primarily on their skills and expertise rather than biographical information.
-
-IMPORTANT: Your analysis should adhere to these strict guidelines:
-1. ONLY highlight skills that EXACTLY match the specific domain expertise required (e.g., "healthcare compliance" not just general "compliance")
-2. DO NOT make unsupported assumptions about transferable skills across different legal domains
-3. If a lawyer has expertise in a related but not exact area, clearly acknowledge the limitation (e.g., "While they have experience in financial compliance, their profile doesn't show specific healthcare compliance expertise")
-4. Focus on the lawyer's self-reported skill areas and values that directly address the client's specific needs
-5. Mention availability when relevant to taking on this work
+    # Same ranking as match_lawyers_with_domain_expertise, scored as a dot product of
+    # the query's domain strengths with each lawyer's precomputed domain vector
+    return rank_lawyers_batch(data, [query], top_n, facet_filters)[0]
 
-Be honest and precise about matching. It's better to acknowledge limitations than to overstate expertise in areas not supported by their skill profile.
-
-Format your response in JSON like this:
-{
-    "lawyer1_name": "Detailed explanation of why lawyer 1 is an excellent match or acknowledgment of limitations...",
-    "lawyer2_name": "Detailed explanation of why lawyer 2 is an excellent match or acknowledgment of limitations...",
-    "lawyer3_name": "Detailed explanation of why lawyer 3 is an excellent match or acknowledgment of limitations..."
-}
-"""
-    return prompt
+# Function to format Claude's analysis prompt (updated to include domain information).
+# The prompt is built by prompt_builder.py within a token budget, using condensed
+# profiles cached per roster version, and split into cacheable prefix parts.
+def format_claude_prompt(query, matches, roster_version=None):
+    return build_rationale_prompt_parts(query, matches, roster_version)
 
 # Function to call Claude API using requests instead of anthropic client
-def call_claude_api(prompt):
+def call_claude_api(prompt, matches=None):
     api_key = os.environ.get("ANTHROPIC_API_KEY", "YOUR_API_KEY_HERE")
     
     # Handle the case where no API key is provided
     if api_key == "YOUR_API_KEY_HERE":
-        # Return mock reasoning data for the lawyers
-        try:
-            return {
-                match['lawyer']['name']: f"This lawyer has strong expertise in areas related to your client's needs, particularly in {', '.join([s['skill'] for s in match['matched_skills'][:2]])}. Their {match['lawyer']['practice_area']} background makes them well-suited for this matter. They allocated significant points to these skills in their self-assessment, indicating confidence in handling such cases."
-                for match in matches[:5]
-            }
-        except NameError:
-            # Fallback if 'matches' is not defined in this scope
-            return {"Error": "No API key provided and could not generate mock data"}
+        # Use the local template-based rationales for the lawyers
+        return generate_offline_rationales(matches or [])
     
     try:
-        # Import just what we need to make an HTTP request
-        import requests
-        import json
-        
-        # Claude API endpoint
-        url = "https://api.anthropic.com/v1/messages"
-        
-        # Headers
-        headers = {
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
-        
-        # Request payload - Use Haiku for faster responses
-        payload = {
-            "model": "claude-3-haiku-20240307",
-            "max_tokens": 1000,
-            "temperature": 0.0,
-            "system": "You are a legal resource coordinator that analyzes lawyer expertise matches. You provide brief, factual explanations about why specific lawyers match particular client legal needs based on their self-reported skills. Focus primarily on skills and expertise rather than biographical information. Keep explanations concise and focused on the relevant expertise.",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
-        
-        # Make the request
-        response = requests.post(url, headers=headers, json=payload)
-        
-        # Check for successful response
-        if response.status_code == 200:
-            response_json = response.json()
-            response_text = response_json.get("content", [{}])[0].get("text", "")
-            
-            # Find JSON part in the response
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-            else:
-                return {"error": "Could not extract JSON from Claude's response"}
-        else:
-            return {"error": f"API call failed with status code {response.status_code}: {response.text}"}
+        # Requests go through the process-wide gateway, which joins identical in-flight
+        # requests from other sessions and enforces the global rate limits. Pairs are
+        # parsed as they stream in, so truncated responses keep finished rationales.
+        return RATIONALE_GATEWAY.fetch(prompt, api_key, timeout=RATIONALE_TIMEOUT_SECONDS)
+    
+    except concurrent.futures.TimeoutError:
+        # The shared request keeps running and may still serve a later search
+        st.warning("The detailed match analysis is taking longer than expected; showing the standard analysis instead.")
+        return {"error": "API timeout"}
             
     except Exception as e:
         st.error(f"Error calling Claude API: {str(e)}")
@@ -934,19 +780,126 @@ def call_claude_api(prompt):
         # Return a fallback response
         return {"error": f"API error: {str(e)}"}
 
-# IMPROVED: Callback function to set query and trigger search
+# Function to check whether rationales should be requested from Claude
+def use_llm_rationales():
+    return RATIONALE_MODE != "offline" and os.environ.get("ANTHROPIC_API_KEY", "YOUR_API_KEY_HERE") != "YOUR_API_KEY_HERE"
+
+# Function to run a search, reusing the shared result cache when possible
+def run_search(data, query, facet_filters, top_n=5):
+    """
+    Computes (or fetches from the shared cache) the matches, identified domains and
+    rationales for a query. The rationales start as offline ones; when Claude is used
+    the result is marked pending and completed by complete_rationales.
+    
+    Returns:
+        dict: Search result state, including the cache key it was computed for
+    """
+    cache_key = make_search_cache_key(query, top_n, facet_filters, data['roster_version'])
+    cached_result = SEARCH_RESULT_CACHE.get(cache_key)
+    if cached_result is not None:
+        return dict(cached_result, key=cache_key)
+    
+    # Correct misspelled words against the skill and domain vocabulary before scoring
+    query, corrections = get_term_index(data).correct_query(query)
+    
+    # Get matches with improved matching algorithm
+    matches = match_lawyers(data, query, top_n, facet_filters=facet_filters)
+    reasoning = {}
+    query_domains = {}
+    
+    if matches:
+        # Offline rationales are instant; they are final in offline mode and the
+        # placeholder (and timeout fallback) while Claude's answer is fetched
+        reasoning = generate_offline_rationales(matches)
+        
+        # Get identified legal domains from the query
+        query_domains = identify_query_domains(query)
+    
+    result = {
+        'matches': matches,
+        'reasoning': reasoning,
+        'query_domains': query_domains,
+        'query': query,
+        'corrections': corrections,
+        'rationale_pending': bool(matches) and use_llm_rationales()
+    }
+    
+    if not result['rationale_pending']:
+        SEARCH_RESULT_CACHE.put(cache_key, result)
+    
+    return dict(result, key=cache_key)
+
+# Function to replace the offline rationales of a search with Claude's
+def complete_rationales(data, search_results):
+    """
+    Fetches Claude's rationales for a pending search. Lawyers missing from the answer,
+    or all of them on timeout or error, keep their offline rationale.
+    
+    Returns:
+        dict: The completed search result state
+    """
+    matches = search_results['matches']
+    claude_prompt = format_claude_prompt(search_results['query'], matches, data['roster_version'])
+    llm_reasoning = call_claude_api(claude_prompt, matches)
+    
+    result = {key: value for key, value in search_results.items() if key != 'key'}
+    result['rationale_pending'] = False
+    
+    # Failed API calls are not cached so the next search retries them
+    if 'error' not in llm_reasoning:
+        result['reasoning'] = dict(search_results['reasoning'], **llm_reasoning)
+        SEARCH_RESULT_CACHE.put(search_results['key'], result)
+    
+    return dict(result, key=search_results['key'])
+
+# IMPROVED: Callback function to set query and trigger search. Runs as a widget
+# callback before the script body, so no extra rerun is needed to show results
 def set_query_and_search(text):
     st.session_state['query'] = text
+    st.session_state['query_input'] = text
+    st.session_state['search_pressed'] = True
+    st.session_state['similar_to'] = None
+
+# Callback for a typeahead suggestion: replaces the word being typed with the
+# suggestion without starting a search
+def complete_query(prefix_start, suggestion):
+    text = st.session_state['query_input'][:prefix_start] + suggestion + " "
+    st.session_state['query'] = text
+    st.session_state['query_input'] = text
+
+# Callback for the search button. An explicit search always re-runs the lookup
+# (which still goes through the shared result cache)
+def trigger_search():
     st.session_state['search_pressed'] = True
-    # Force a rerun to immediately show results
-    st.experimental_rerun()
+    st.session_state['search_results'] = None
+    st.session_state['similar_to'] = None
+
+# Callback for a "More like" button: remembers whose substitutes to show
+def show_similar_lawyers(name, email):
+    st.session_state['similar_to'] = (name, email)
     
 # Initialize session state variables
 if 'query' not in st.session_state:
     st.session_state['query'] = ""
+if 'query_input' not in st.session_state:
+    st.session_state['query_input'] = st.session_state['query']
 if 'search_pressed' not in st.session_state:
     st.session_state['search_pressed'] = False
+# Result of the last search in this session, re-rendered on reruns
+if 'search_results' not in st.session_state:
+    st.session_state['search_results'] = None
     
+# Load data
+try:
+    data = load_lawyer_data(compute_roster_version())
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    data = None
+
+# Similar-lawyer neighbour lists are precomputed once per roster version
+if data:
+    get_similarity_index(data)
+
 # Set up sidebar
 st.sidebar.title("⚖️ Legal Expert Finder")
 st.sidebar.title("About")
@@ -966,10 +919,59 @@ recent_queries = [
     "Commercial lease agreement review"
 ]
 for query in recent_queries:
-    if st.sidebar.button(query, key=f"recent_{query}", help=f"Use this recent query: {query}"):
-        set_query_and_search(query)
+    st.sidebar.button(
+        query,
+        key=f"recent_{query}",
+        help=f"Use this recent query: {query}",
+        on_click=set_query_and_search,
+        args=(query,)
+    )
 
 st.sidebar.markdown("---")
+
+# Profile filters in sidebar, backed by the facet bitmaps built at load time
+facet_filters = {}
+if data and 'facet_index' in data:
+    st.sidebar.markdown("### Filter Lawyers")
+    current_filters = {
+        name: st.session_state.get(f"facet_{name}", []) for name in FACET_FIELDS
+    }
+    for facet, facet_label in FACET_FIELDS.items():
+        # Options come from the whole roster so the widget (whose id is built from its
+        # options) stays the same when other facets change; live counts go below it
+        options = [value for value, _ in facet_value_counts(data['facet_index'], facet)]
+        selected = st.sidebar.multiselect(facet_label, options=options, key=f"facet_{facet}")
+        if selected:
+            facet_filters[facet] = selected
+
+        live_counts = [
+            f"{value} ({count})"
+            for value, count in facet_value_counts(data['facet_index'], facet, current_filters)
+            if count
+        ]
+        if live_counts:
+            st.sidebar.caption(", ".join(live_counts[:FACET_COUNTS_SHOWN]))
+    st.sidebar.markdown("---")
+
+# Shared search cache counters
+cache_stats = SEARCH_RESULT_CACHE.stats()
+st.sidebar.caption(
+    f"Search cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['size']} cached searches)"
+)
+prompt_cache_stats = PROMPT_CACHE_STATS.snapshot()
+if prompt_cache_stats['requests']:
+    st.sidebar.caption(
+        f"Prompt cache: {prompt_cache_stats['hits']} hits / {prompt_cache_stats['misses']} misses "
+        f"({prompt_cache_stats['cache_read_input_tokens']} input tokens read from cache)"
+    )
+gateway_stats = RATIONALE_GATEWAY.stats()
+if gateway_stats['upstream_calls']:
+    st.sidebar.caption(
+        f"LLM gateway: {gateway_stats['upstream_calls']} upstream calls, "
+        f"{gateway_stats['coalesced_requests']} joined in-flight requests"
+    )
+
 st.sidebar.markdown("### Need Help?")
 st.sidebar.info(
     "For assistance with the matching tool or to add a lawyer to the database, contact the Legal Operations team at legalops@example.com"
@@ -979,9 +981,6 @@ st.sidebar.info(
 st.title("⚖️ Legal Expert Finder")
 st.markdown("Match client legal needs with the right lawyer based on expertise")
 
-# Load data
-data = load_lawyer_data()
-
 # Preset queries
 preset_queries = [
     "Privacy compliance and cross-border data transfers",
@@ -999,12 +998,27 @@ preset_queries = [
 # Query input section
 query = st.text_area(
     "Describe client's legal needs in detail:", 
-    value=st.session_state['query'],
     height=100,
     placeholder="Example: Client needs a lawyer with blockchain governance experience for cross-border cryptocurrency transactions",
     key="query_input"
 )
 
+# Typeahead suggestions for the last word of the query
+last_word = re.search(r"[\w&-]{2,}$", query or "")
+if data and last_word:
+    suggestions = get_typeahead_index(data).complete(last_word.group(0), k=5, kinds=("domain", "skill", "term"))
+    if suggestions:
+        suggestion_cols = st.columns(len(suggestions))
+        for col, suggestion in zip(suggestion_cols, suggestions):
+            with col:
+                st.button(
+                    suggestion['text'],
+                    key=f"suggestion_{suggestion['text']}",
+                    help=f"{suggestion['kind'].title()} · {suggestion['weight']:g} lawyers",
+                    on_click=complete_query,
+                    args=(last_word.start(), suggestion['text'])
+                )
+
 # Preset query buttons in rows of 3
 st.markdown("### Common Client Needs")
 cols = st.columns(3)
@@ -1012,200 +1026,142 @@ for i, preset_query in enumerate(preset_queries):
     col_idx = i % 3
     with cols[col_idx]:
         # IMPROVED: Use set_query_and_search for immediate refresh
-        if st.button(preset_query, key=f"preset_{i}"):
-            set_query_and_search(preset_query)
+        st.button(preset_query, key=f"preset_{i}", on_click=set_query_and_search, args=(preset_query,))
 
 # Update query in session state from text area
 if query:
     st.session_state['query'] = query
 
+# Number of matches to return
+top_n = st.selectbox("Number of matches", options=[5, 10, 25, 50], key='top_n')
+
 # Search button
-search_pressed = st.button("🔍 Find Matching Lawyers", type="primary", use_container_width=True)
-if search_pressed:
-    st.session_state['search_pressed'] = True
-    # Force a rerun to ensure results display immediately
-    st.experimental_rerun()
+st.button("🔍 Find Matching Lawyers", type="primary", use_container_width=True, on_click=trigger_search)
 
 # Display results when search is pressed
 if st.session_state['search_pressed'] and st.session_state['query']:
-    with st.spinner("Matching client needs with our legal experts..."):
-        # Get matches with improved matching algorithm
-        matches = match_lawyers(data, st.session_state['query'])
+    # Recompute only when the query or filters changed since the last search in this
+    # session; other reruns (widget clicks under the results) re-render the stored state
+    search_key = make_search_cache_key(st.session_state['query'], top_n, facet_filters, data['roster_version'])
+    search_results = st.session_state['search_results']
+    
+    if search_results is None or search_results['key'] != search_key:
+        with st.spinner("Matching client needs with our legal experts..."):
+            search_results = run_search(data, st.session_state['query'], facet_filters, top_n)
+        st.session_state['search_results'] = search_results
+        st.session_state['results_page'] = 1
+    
+    matches = search_results['matches']
+    reasoning = search_results['reasoning']
+    query_domains = search_results['query_domains']
+    
+    if search_results.get('corrections'):
+        st.caption(f"Showing results for: *{search_results['query']}*")
+    
+    if not matches:
+        st.warning("No matching lawyers found. Please try a different query.")
+    else:
+        # Display results with domain information
+        st.markdown("## Matching Legal Experts")
         
-        if not matches:
-            st.warning("No matching lawyers found. Please try a different query.")
-        else:
-            # Call Claude API for reasoning
-            claude_prompt = format_claude_prompt(st.session_state['query'], matches)
-            reasoning = call_claude_api(claude_prompt)
-            
-            # Get identified legal domains from the query
-            query_domains = identify_query_domains(st.session_state['query'])
-            
-            # Display results with domain information
-            st.markdown("## Matching Legal Experts")
-            
-            if query_domains:
-                # Show which legal domains were identified
-                domain_str = ", ".join([f"{domain} ({score:.0%})" for domain, score in query_domains.items()])
-                st.markdown(f"**Identified Legal Domains:** {domain_str}")
-            
-            st.markdown(f"Found {len(matches)} lawyers matching client needs (sorted by domain expertise match):")
-            
-            # Sort by match score for display
-            sorted_matches = sorted(matches, key=lambda x: x['score'], reverse=True)
-            
-            for match in sorted_matches:
-                lawyer = match['lawyer']
-                matched_skills = match['matched_skills']
-                
-                with st.container():
-                    # Determine availability class based on status
-                    availability_class = "availability-tag"
-                    if "Limited" in lawyer['availability'] or "Vacation" in lawyer['availability'] or "Not Available" in lawyer['availability']:
-                        availability_class = "availability-tag-limited"
-                    elif "Available" in lawyer['availability']:
-                        availability_class = "availability-tag-available"
-                    elif "Ad Hoc" in lawyer['availability']:
-                        availability_class = "availability-tag-adhoc"
-                        
-                    # Use raw HTML string concatenation to avoid Streamlit escaping issues
-                    html_output = f"""
-                    <div class="lawyer-card">
-                        <div class="lawyer-name">
-                            {lawyer['name']}
-                            <span class="{availability_class}">{lawyer['availability']}</span>
-                        </div>
-                        <div class="lawyer-email">{lawyer['email']}</div>
-                        <div class="practice-area">Practice Area: {lawyer['practice_area']}</div>
-                    """
-                    
-                    # Get bio data
-                    bio = lawyer['bio'] if 'bio' in lawyer else {}
-                    
-                    # Create biographical info section
-                    bio_html = ""
-                    if bio:
-                        bio_html += '<div class="bio-section">'
-                        if bio.get('level'):
-                            bio_html += f'<div class="bio-level">{bio["level"]}</div>'
-                        
-                        bio_details = []
-                        if bio.get('call'):
-                            bio_details.append(f'Called to Bar: {bio["call"]}')
-                        if bio.get('jurisdiction'):
-                            bio_details.append(f'Jurisdiction: {bio["jurisdiction"]}')
-                        if bio.get('location'):
-                            bio_details.append(f'Location: {bio["location"]}')
-                        
-                        if bio_details:
-                            bio_html += f'<div class="bio-details">{" | ".join(bio_details)}</div>'
-                            
-                        if bio.get('previous_in_house'):
-                            bio_html += f'<div class="bio-experience"><strong>In-House Experience:</strong> {bio["previous_in_house"]}</div>'
-                        if bio.get('previous_firms'):
-                            bio_html += f'<div class="bio-experience"><strong>Previous Firms:</strong> {bio["previous_firms"]}</div>'
-                        if bio.get('education'):
-                            bio_html += f'<div class="bio-education"><strong>Education:</strong> {bio["education"]}</div>'
-                            
-                        bio_html += '</div>'
-                    
-                    # Add the bio section to the HTML output
-                    html_output += bio_html
-                    
-                    # Add availability details
-                    html_output += '<div class="availability-details">'
-                    if lawyer['days_available'] is not None:
-                        html_output += f"Days available: {lawyer['days_available']} | "
-                    if lawyer['hours_available'] is not None:
-                        html_output += f"Hours available: {lawyer['hours_available']}"
-                    html_output += '</div>'
-                    
-                    # Add vacation info
-                    if lawyer['vacation']:
-                        vacation_dates = ", ".join(lawyer['vacation']) if isinstance(lawyer['vacation'], list) else lawyer['vacation']
-                        html_output += f'<div class="vacation-info">Vacation: {vacation_dates}</div>'
-                    
-                    # Add engagement note
-                    if lawyer['engagement_note']:
-                        html_output += f'<div class="engagement-note">{lawyer["engagement_note"]}</div>'
-                    
-                    # Add industry experience if available
-                    if bio and bio.get('industry_experience'):
-                        html_output += f'<div class="industry-experience"><strong>Industry Experience:</strong> {bio["industry_experience"]}</div>'
-                    
-                    # Domain expertise indicator
-                    domain_expertise = "has_domain_expertise" in match and match["has_domain_expertise"]
-                    domain_tag = '<span style="background-color: #e8f5e9; color: #2e7d32; border-radius: 10px; padding: 2px 8px; font-size: 12px; margin-left: 10px;">Domain Expert</span>' if domain_expertise else ""
-                    
-                    # Show matched domains if available
-                    matched_domains_html = ""
-                    if "matched_domains" in match and match["matched_domains"]:
-                        matched_domains_html = '<div style="margin-top: 5px;"><strong>Expertise Areas:</strong> ' + ', '.join(match["matched_domains"]) + '</div>'
-                    
-                    # Add the rest of the card
-                    html_output += f"""
-                        <div class="billable-rate">Rate: {lawyer['billable_rate']} | Recent Client: {lawyer['last_client']}</div>
-                        {matched_domains_html}
-                        <div style="margin-top: 10px;">
-                            <strong>Relevant Expertise:</strong> {domain_tag}<br/>
-                            {"".join([f'<span class="skill-tag">{skill["skill"]}: {skill["value"]}</span>' for skill in matched_skills])}
-                        </div>
-                        <div class="reasoning-box">
-                            <div class="match-rationale-title">MATCH ANALYSIS:</div>
-                            {reasoning.get(lawyer['name'], 'This lawyer has relevant expertise in the areas described in the client query.')}
-                        </div>
-                    </div>
-                    """
-                    
-                    # Render the HTML
-                    st.markdown(html_output, unsafe_allow_html=True)
-            
-            # Action buttons for results
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("📧 Email These Matches to Requester", use_container_width=True):
-                    st.success("Match results have been emailed to the requester!")
-            with col2:
-                if st.button("📆 Schedule Availability Check", use_container_width=True):
-                    st.success("Availability check has been scheduled with these lawyers!")
+        if query_domains:
+            # Show which legal domains were identified
+            domain_str = ", ".join([f"{domain} ({score:.0%})" for domain, score in query_domains.items()])
+            st.markdown(f"**Identified Legal Domains:** {domain_str}")
+        
+        st.markdown(f"Found {len(matches)} lawyers matching client needs (sorted by domain expertise match):")
+        
+        # Sort by match score for display
+        sorted_matches = sorted(matches, key=lambda x: x['score'], reverse=True)
+        
+        # Render the current page of cards as a single batched element
+        page = st.session_state.get('results_page', 1)
+        page_matches, page_count = paginate(sorted_matches, page)
+        cards_placeholder = st.empty()
+        cards_placeholder.markdown(render_lawyer_cards(page_matches, reasoning), unsafe_allow_html=True)
+        
+        # The offline rationales stay on screen until Claude's answer replaces them
+        if search_results.get('rationale_pending'):
+            with st.spinner("Preparing detailed match analysis..."):
+                search_results = complete_rationales(data, search_results)
+            st.session_state['search_results'] = search_results
+            reasoning = search_results['reasoning']
+            cards_placeholder.markdown(render_lawyer_cards(page_matches, reasoning), unsafe_allow_html=True)
+        
+        if page_count > 1:
+            st.radio(
+                "Results page",
+                options=list(range(1, page_count + 1)),
+                horizontal=True,
+                key='results_page'
+            )
+        
+        # Action buttons for results
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📧 Email These Matches to Requester", use_container_width=True):
+                st.success("Match results have been emailed to the requester!")
+        with col2:
+            if st.button("📆 Schedule Availability Check", use_container_width=True):
+                st.success("Availability check has been scheduled with these lawyers!")
+        
+        # "More like this": closest skill profiles to a lawyer on this page, for when
+        # they are away or fully booked
+        similar_cols = st.columns(min(len(page_matches), 5) or 1)
+        for i, match in enumerate(page_matches):
+            with similar_cols[i % len(similar_cols)]:
+                st.button(
+                    f"👥 More like {match['lawyer']['name']}",
+                    key=f"similar_{i}",
+                    use_container_width=True,
+                    on_click=show_similar_lawyers,
+                    args=(match['lawyer']['name'], match['lawyer']['email'])
+                )
+        
+        similar_to = st.session_state.get('similar_to')
+        source_lawyer = next(
+            (match['lawyer'] for match in sorted_matches if (match['lawyer']['name'], match['lawyer']['email']) == similar_to),
+            None
+        )
+        if source_lawyer is not None:
+            st.markdown(f"### Lawyers Similar to {source_lawyer['name']}")
+            available_only = st.checkbox("Only show lawyers with availability", value=True, key='similar_available_only')
+            similar_matches = similar_lawyer_matches(data, source_lawyer, k=5, available_only=available_only)
+            if similar_matches:
+                similar_reasoning = {
+                    match['lawyer']['name']: (
+                        f"{match['score']:.0%} similar skill profile to {source_lawyer['name']} "
+                        "(cosine similarity of self-reported skill points). Shared skills are listed above."
+                    )
+                    for match in similar_matches
+                }
+                st.markdown(render_lawyer_cards(similar_matches, similar_reasoning), unsafe_allow_html=True)
+            else:
+                st.info("No similar lawyers found with the current availability filter.")
 
 # Show exploration section when no search is active
 if not st.session_state['search_pressed'] or not st.session_state['query']:
     st.markdown("## Explore Available Legal Expertise")
     
     if data:
-        # Create a visual breakdown of legal expertise
-        all_skills = {}
-        for lawyer in data['lawyers']:
-            for skill, value in lawyer['skills'].items():
-                if skill in all_skills:
-                    all_skills[skill] += value
-                else:
-                    all_skills[skill] = value
-        
-        # Get top 20 skills by total points
-        top_skills = sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:20]
+        # Aggregates are computed once per roster version
+        roster_stats = get_roster_stats(data)
         
         # Show bar chart of top skills in scrollable container
         st.markdown("### Most Common Legal Expertise Areas")
         st.markdown('<div class="scroll-container">', unsafe_allow_html=True)
-        chart_data = pd.DataFrame({
-            'Skill': [s[0] for s in top_skills],
-            'Total Points': [s[1] for s in top_skills]
-        })
-        st.bar_chart(chart_data.set_index('Skill'))
+        st.bar_chart(roster_stats['top_skills_chart'])
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Quick stats
         st.markdown("### Firm Resource Overview")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Lawyers", len(data['lawyers']))
+            st.metric("Total Lawyers", roster_stats['total_lawyers'])
         with col2:
-            st.metric("Expertise Areas", len(data['unique_skills']))
+            st.metric("Expertise Areas", roster_stats['total_skills'])
         with col3:
-            st.metric("Currently Available", f"{int(len(data['lawyers']) * 0.4)}")  # Mock data
+            st.metric("Currently Available", roster_stats['currently_available'])
         
         st.markdown("### Instructions for Matching")
         st.markdown("""
@@ -0,0 +1,119 @@
+# Offline Rationale Generator
+# This file builds deterministic, template-based match rationales from the matched
+# skills, matched domains and bio fields, without calling the LLM
+
+import os
+import re
+
+# How rationales are produced: "llm" shows offline rationales while the LLM answer is
+# fetched and falls back to them on timeout or error; "offline" never calls the LLM
+RATIONALE_MODE = os.environ.get("RATIONALE_MODE", "llm").lower()
+
+# Seconds to wait for the LLM before keeping the offline rationales
+RATIONALE_TIMEOUT_SECONDS = float(os.environ.get("RATIONALE_TIMEOUT_SECONDS", "20"))
+
+# Availability phrases used in the rationale
+AVAILABILITY_PHRASES = {
+    "Available Now": "is currently available to take on new work",
+    "Partially Available": "has partial availability for new work",
+    "Available for Ad Hoc": "is available for ad hoc work",
+    "Available Soon": "expects their availability to increase soon",
+    "Limited Availability": "has limited availability at the moment",
+    "Very Limited Availability": "has very limited availability at the moment",
+    "On Vacation": "is currently on vacation",
+    "Not Available": "is not taking on new work right now"
+}
+
+# Function to format a skill point value without a trailing ".0"
+def _format_points(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+# Function to join a list of phrases as "a, b and c"
+def _join_phrases(items):
+    items = [item for item in items if item]
+    if len(items) <= 1:
+        return "".join(items)
+    return ", ".join(items[:-1]) + " and " + items[-1]
+
+# Function to put "a" or "an" before a title ("an Associate", "a Senior Counsel")
+def _with_article(title):
+    return f"{'an' if title[:1].lower() in 'aeiou' else 'a'} {title}"
+
+# Function to take the first few entries of a multi-valued bio field
+def _first_values(text, limit=3):
+    values = [value.strip(" .\u200b") for value in re.split(r"[;,\n]", text or "")]
+    return [value for value in values if value][:limit]
+
+# Function to build the offline rationale for one match
+def generate_offline_rationale(match):
+    """
+    Builds a short factual rationale for a match from its skills, domains and bio
+
+    Args:
+        match (dict): Match returned by the matcher
+
+    Returns:
+        str: Rationale text
+    """
+    lawyer = match['lawyer']
+    bio = lawyer.get('bio') or {}
+    name = lawyer['name'].strip()
+    sentences = []
+
+    skills = match.get('matched_skills') or []
+    skill_phrases = [f"{skill['skill']} ({_format_points(skill['value'])} points)" for skill in skills[:3]]
+    domains = match.get('matched_domains') or []
+
+    if skill_phrases and domains:
+        sentences.append(
+            f"{name} allocated self-assessed points to {_join_phrases(skill_phrases)}, "
+            f"which relate to the {_join_phrases(domains)} expertise identified in this request."
+        )
+    elif skill_phrases:
+        sentences.append(
+            f"{name} allocated self-assessed points to {_join_phrases(skill_phrases)}, "
+            f"matched on the keywords of this request rather than a specific legal domain."
+        )
+    else:
+        sentences.append(f"{name}'s profile only loosely matches this request.")
+
+    if not match.get('has_domain_expertise', False) and domains:
+        sentences.append("Their profile does not show a skill that names these domains directly, so the fit should be confirmed.")
+
+    background = []
+    level = ' '.join((bio.get('level') or '').split())
+    if level:
+        background.append(_with_article(level))
+    if bio.get('call'):
+        background.append(f"called to the bar in {' '.join(bio['call'].split())}")
+    if background:
+        jurisdictions = _first_values(bio.get('jurisdiction'))
+        where = f" with practice in {_join_phrases(jurisdictions)}" if jurisdictions else ""
+        sentences.append(f"They are {', '.join(background)}{where}.")
+
+    in_house = _first_values(bio.get('previous_in_house'), 2)
+    if in_house:
+        sentences.append(f"In-house experience includes {_join_phrases(in_house)}.")
+
+    industries = _first_values(bio.get('industry_experience'))
+    if industries:
+        sentences.append(f"Industry experience includes {_join_phrases(industries)}.")
+
+    availability = AVAILABILITY_PHRASES.get(lawyer.get('availability'))
+    if availability:
+        sentences.append(f"{name} {availability}.")
+
+    return " ".join(sentences)
+
+# Function to build offline rationales for a list of matches
+def generate_offline_rationales(matches):
+    """
+    Builds offline rationales for every match
+
+    Args:
+        matches (list): Matches returned by the matcher
+
+    Returns:
+        dict: Lawyer names mapped to rationale text (same shape as the LLM response)
+    """
+    return {match['lawyer']['name']: generate_offline_rationale(match) for match in matches}
@@ -0,0 +1,237 @@
+# Rationale Prompt Builder
+# This file builds the compact, token-budgeted prompt sent to Claude for the
+# match rationales
+
+import math
+import os
+import re
+
+from legal_domains import LEGAL_DOMAINS
+from roster_version import cached_per_roster_version
+
+# Total token budget for the user prompt (overridable through the environment). The
+# cacheable prefix (system prompt, instructions, profiles) is most of it, so budgets
+# much below claude_client.MIN_CACHEABLE_PROMPT_TOKENS + 100 turn prompt caching off.
+# At 3000 the budget rarely binds: five matches on the bundled roster use 1600-2500
+# prefix tokens, limited by how much bio text they have, and the shorter ones are
+# sent uncached.
+PROMPT_TOKEN_BUDGET = int(os.environ.get("RATIONALE_PROMPT_TOKEN_BUDGET", "3000"))
+
+# Rough characters-per-token ratio for English prose with Claude's tokenizer
+CHARS_PER_TOKEN = 3.5
+
+# Longest text kept for any single bio field in the condensed profile
+FIELD_CHAR_LIMIT = 400
+
+# Bio fields in their default order of usefulness, with the label used in the prompt
+BIO_FIELD_LABELS = [
+    ('expert', 'Areas of Expertise'),
+    ('practice_areas', 'Practice Areas'),
+    ('industry_experience', 'Industry Experience'),
+    ('level', 'Level/Title'),
+    ('call', 'Called to Bar'),
+    ('jurisdiction', 'Jurisdiction'),
+    ('previous_in_house', 'Previous In-House Experience'),
+    ('previous_firms', 'Previous Law Firms'),
+    ('notable_items', 'Notable Experience'),
+    ('location', 'Location'),
+    ('education', 'Education'),
+    ('awards', 'Awards/Recognition')
+]
+
+PROMPT_INTRO = "I need to analyze and provide detailed reasoning for why specific lawyers match a client's legal needs based on their expertise, skills, and background."
+
+PROMPT_QUERY = 'Client\'s Legal Need: "{query}"'
+
+PROFILES_HEADER = "Here are the matching lawyers with their skills and biographical information:\n"
+
+PROMPT_GUIDELINES = """For each lawyer, provide a DETAILED explanation (at least 3-4 sentences) of why they would be an excellent match for this client need. Focus primarily on their skills and expertise rather than biographical information.
+
+IMPORTANT: Your analysis should adhere to these strict guidelines:
+1. ONLY highlight skills that EXACTLY match the specific domain expertise required (e.g., "healthcare compliance" not just general "compliance")
+2. DO NOT make unsupported assumptions about transferable skills across different legal domains
+3. If a lawyer has expertise in a related but not exact area, clearly acknowledge the limitation (e.g., "While they have experience in financial compliance, their profile doesn't show specific healthcare compliance expertise")
+4. Focus on the lawyer's self-reported skill areas and values that directly address the client's specific needs
+5. Mention availability when relevant to taking on this work
+
+Be honest and precise about matching. It's better to acknowledge limitations than to overstate expertise in areas not supported by their skill profile.
+
+Format your response in JSON like this:
+{
+    "lawyer1_name": "Detailed explanation of why lawyer 1 is an excellent match or acknowledgment of limitations...",
+    "lawyer2_name": "Detailed explanation of why lawyer 2 is an excellent match or acknowledgment of limitations...",
+    "lawyer3_name": "Detailed explanation of why lawyer 3 is an excellent match or acknowledgment of limitations..."
+}
+"""
+
+# Condensed profiles of the current roster version by (name, email), filled as lawyers are first shown
+_condensed_profiles = cached_per_roster_version("condensed_profiles", lambda data: {})
+
+# Function to estimate the token count of a piece of text
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens in a piece of text without calling the API
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+# Function to shorten a bio field to the per-field limit
+def condense_field(text, limit=FIELD_CHAR_LIMIT):
+    """
+    Collapses whitespace and truncates a bio field at a word boundary
+
+    Args:
+        text (str): Raw bio field text
+        limit (int): Maximum number of characters kept
+
+    Returns:
+        str: Condensed text
+    """
+    text = re.sub(r"\s+", " ", text.replace("\u200b", "")).strip()
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",;") + " ..."
+
+# Function to get the condensed bio lines of a lawyer, built once per roster version
+def get_condensed_profile(lawyer, roster_version=None):
+    """
+    Returns the condensed bio lines of a lawyer, cached per roster version
+
+    Args:
+        lawyer (dict): Lawyer profile with attached bio
+        roster_version (str): Roster version the profile belongs to
+
+    Returns:
+        list: (field, line, lowercase text, token estimate) tuples in default priority order
+    """
+    profiles = _condensed_profiles({'roster_version': roster_version})
+    # Names are not unique across the roster; the email tells namesakes apart
+    key = (lawyer['name'], lawyer['email'])
+    profile = profiles.get(key)
+    if profile is not None:
+        return profile
+
+    bio = lawyer.get('bio') or {}
+    profile = []
+    for field, label in BIO_FIELD_LABELS:
+        value = condense_field(bio.get(field, ""))
+        if value:
+            line = f"- {label}: {value}"
+            profile.append((field, line, value.lower(), estimate_tokens(line) + 1))
+
+    # Two sessions building the same profile store equal values
+    profiles[key] = profile
+
+    return profile
+
+# Function to order bio lines by relevance to the identified domains
+def rank_profile_lines(profile, domain_terms):
+    """
+    Orders the condensed bio lines so fields mentioning the query's domain terms come first
+
+    Args:
+        profile (list): Lines from get_condensed_profile
+        domain_terms (list): Lowercase terms of the matched legal domains
+
+    Returns:
+        list: The same lines, most relevant first (default order breaks ties)
+    """
+    def relevance(entry):
+        return sum(1 for term in domain_terms if term in entry[2])
+
+    return sorted(profile, key=relevance, reverse=True)
+
+# Function to build the fixed part of a lawyer block (skills, domains, availability)
+def lawyer_block_core(index, match):
+    """
+    Builds the lines of a lawyer block that are always sent
+
+    Args:
+        index (int): 1-based position of the lawyer in the prompt
+        match (dict): Match returned by the matcher
+
+    Returns:
+        tuple: (header and skill lines, availability lines)
+    """
+    lawyer = match['lawyer']
+
+    lines = [f"LAWYER {index}: {lawyer['name']}", "RELEVANT SKILLS:"]
+    lines.extend(f"- {skill['skill']}: {skill['value']} points" for skill in match['matched_skills'])
+
+    if match.get('matched_domains'):
+        lines.append("MATCHED LEGAL DOMAINS: " + ", ".join(match['matched_domains']))
+
+    availability = [f"AVAILABILITY: {lawyer['availability']}"]
+    if lawyer['days_available'] is not None:
+        availability.append(f"Days available: {lawyer['days_available']}")
+    if lawyer['hours_available'] is not None:
+        availability.append(f"Hours available: {lawyer['hours_available']}")
+    if lawyer['engagement_note']:
+        availability.append(f"Current engagement: {lawyer['engagement_note']}")
+
+    return lines, availability
+
+# Function to build the rationale prompt parts within the token budget
+def build_rationale_prompt_parts(query, matches, roster_version=None, token_budget=PROMPT_TOKEN_BUDGET):
+    """
+    Builds the rationale prompt, keeping each lawyer's skills and availability and
+    filling the remaining budget with the bio fields most relevant to the matched domains.
+    The parts are split by how often they change, so the static instructions and the
+    lawyer profiles can be sent as a cacheable prompt prefix.
+
+    Args:
+        query (str): The client's legal need
+        matches (list): Matches to explain
+        roster_version (str): Roster version, used to reuse condensed profiles
+        token_budget (int): Maximum estimated tokens for the whole prompt
+
+    Returns:
+        dict: 'instructions' (identical for every search), 'profiles' (the lawyer
+              blocks) and 'request' (the client's need)
+    """
+    instructions = PROMPT_INTRO + "\n\n" + PROMPT_GUIDELINES
+    request = PROMPT_QUERY.format(query=query)
+
+    blocks = []
+    for i, match in enumerate(matches, 1):
+        lines, availability = lawyer_block_core(i, match)
+        blocks.append((match, lines, availability))
+
+    # Skills, domains and availability are always sent; bio lines share what is left
+    fixed_tokens = estimate_tokens(instructions) + estimate_tokens(request) + estimate_tokens(PROFILES_HEADER)
+    for _, lines, availability in blocks:
+        fixed_tokens += sum(estimate_tokens(line) + 1 for line in lines + availability) + 4
+    bio_budget = max(0, token_budget - fixed_tokens) // max(1, len(blocks))
+
+    domain_terms = set()
+    for match in matches:
+        for domain in match.get('matched_domains', []):
+            domain_terms.add(domain.lower())
+            domain_terms.update(term.lower() for term in LEGAL_DOMAINS.get(domain, []))
+    domain_terms = sorted(domain_terms)
+
+    sections = [PROFILES_HEADER]
+    for match, lines, availability in blocks:
+        bio_lines = []
+        remaining = bio_budget
+        profile = get_condensed_profile(match['lawyer'], roster_version)
+        for field, line, _, tokens in rank_profile_lines(profile, domain_terms):
+            if tokens <= remaining:
+                bio_lines.append(line)
+                remaining -= tokens
+
+        block = lines
+        if bio_lines:
+            block = block + ["BIOGRAPHICAL INFORMATION:"] + bio_lines
+        sections.append("\n".join(block + availability) + "\n")
+
+    return {
+        'instructions': instructions,
+        'profiles': "\n".join(sections),
+        'request': request
+    }
@@ -0,0 +1,60 @@
+# Rationale Response Parsing
+# This file extracts the "lawyer name": "rationale" pairs from Claude's JSON answer
+# incrementally, so truncated or streamed responses still yield every finished pair
+
+import json
+import re
+
+# One complete "key": "value" pair of JSON strings (escaped quotes allowed inside)
+PAIR_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+
+# Function to decode the body of a JSON string literal
+def _decode_json_string(raw):
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        # Invalid escapes in model output: keep the text as written
+        return raw
+
+# Class parsing a rationale response chunk by chunk
+class RationaleStreamParser:
+    """
+    Incremental parser for the rationale JSON object. Feed it the response text in
+    any number of chunks; each call returns the pairs completed by that chunk.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = None
+        self.rationales = {}
+
+    def feed(self, chunk):
+        """
+        Adds a chunk of response text and extracts any newly completed pairs
+
+        Args:
+            chunk (str): Next piece of the response text
+
+        Returns:
+            dict: Lawyer names mapped to rationales completed by this chunk
+        """
+        self._buffer += chunk
+
+        # Skip any preamble before the JSON object starts
+        if self._position is None:
+            start = self._buffer.find("{")
+            if start < 0:
+                return {}
+            self._position = start + 1
+
+        completed = {}
+        while True:
+            match = PAIR_PATTERN.search(self._buffer, self._position)
+            if not match:
+                break
+            name = _decode_json_string(match.group(1))
+            completed[name] = _decode_json_string(match.group(2))
+            self._position = match.end()
+
+        self.rationales.update(completed)
+        return completed
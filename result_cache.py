@@ -0,0 +1,98 @@
+# Search Result Cache
+# This file keeps a process-wide LRU cache of full search results (matches, domains
+# and rationales) so Streamlit reruns and other sessions reuse earlier work
+
+import re
+import threading
+from collections import OrderedDict
+
+# Class holding the cached results with hit/miss accounting
+class ResultCache:
+    """
+    Thread-safe LRU cache shared by every Streamlit session in the process
+    
+    Args:
+        maxsize (int): Maximum number of results kept before the oldest is evicted
+    """
+    
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Returns the cache counters
+        
+        Returns:
+            dict: Hits, misses, evictions, current size and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Function to normalise a query for cache lookups
+def normalise_query(query):
+    """
+    Normalises a query so that case and whitespace differences share a cache entry
+    
+    Args:
+        query (str): The search query
+        
+    Returns:
+        str: Lowercase query with collapsed whitespace
+    """
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+# Function to build the cache key for a search
+def make_search_cache_key(query, top_n, facet_filters, roster_version):
+    """
+    Builds a hashable cache key for a search
+    
+    Args:
+        query (str): The search query
+        top_n (int): Number of matches requested
+        facet_filters (dict): Facet selections applied to the search
+        roster_version (str): Version stamp of the roster the search ran against
+        
+    Returns:
+        tuple: Cache key
+    """
+    filters = tuple(sorted(
+        (facet, tuple(sorted(values))) for facet, values in (facet_filters or {}).items() if values
+    ))
+    return (normalise_query(query), top_n, filters, roster_version)
+
+# Process-wide cache shared by all sessions
+SEARCH_RESULT_CACHE = ResultCache(maxsize=256)
@@ -0,0 +1,267 @@
+# Roster Ingestion
+# This file reads the survey and bio exports, from the CSVs or their Parquet
+# conversions, in fixed-size chunks with compact dtypes declared up front. Skill
+# points stream straight into a sparse (CSR) lawyer x skill matrix, so the parser
+# holds one chunk of raw rows at a time. The app still expands the CSR arrays into a
+# dense uint8 matrix afterwards (csr_to_dense), so only ingest is memory-bounded, not
+# the loaded roster. Run it as a script to convert the CSVs to Parquet.
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from roster_version import BIO_CSV, BIO_PARQUET, SKILLS_CSV, SKILLS_PARQUET
+from skill_taxonomy import group_skill_columns
+
+# Rows parsed per chunk
+INGEST_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", "5000"))
+
+# File suffix of the columnar roster sources
+PARQUET_SUFFIX = ".parquet"
+
+# Skill points are whole numbers (lawyers spread 120 points over their skills); they
+# are parsed as float32 (blank cells are NaN) and stored as uint8, in the CSR arrays
+# and in the dense skill matrix
+SKILL_POINTS_DTYPE = np.uint8
+
+# Survey columns identifying the submitter
+SUBMITTER_COLUMNS = ['Submitter Name', 'Submitter Email']
+
+# Bio CSV columns read for each bio field (the export carries more, including
+# trailing unnamed columns, which are skipped)
+BIO_COLUMNS = {
+    'first_name': 'First Name',
+    'last_name': 'Last Name',
+    'level': 'Level/Title',
+    'call': 'Call',
+    'jurisdiction': 'Jurisdiction',
+    'location': 'Location',
+    'practice_areas': 'Area of Practise + Add Info',
+    'industry_experience': 'Industry Experience',
+    'languages': 'Languages',
+    'previous_in_house': 'Previous In-House Companies',
+    'previous_firms': 'Previous Companies/Firms',
+    'education': 'Education',
+    'awards': 'Awards/Recognition',
+    'notable_items': 'Notable Items/Personal Details ',
+    'expert': 'Expert'
+}
+
+# Bio columns with few distinct values, parsed as categoricals
+BIO_CATEGORICAL_COLUMNS = ['Level/Title', 'Call', 'Jurisdiction', 'Location', 'Languages', 'Expert']
+
+# Function to check whether a roster source is a Parquet file
+def is_parquet(path):
+    return path.endswith(PARQUET_SUFFIX)
+
+# Function to read the survey export into a sparse skill matrix
+def read_skill_survey(path, chunk_rows=INGEST_CHUNK_ROWS):
+    """
+    Reads the skills survey (CSV or Parquet) chunk by chunk. Each chunk's skill columns
+    are folded into their canonical skills (max points across a skill's columns) and
+    appended to CSR arrays; only the submitter and skill columns are read.
+
+    Args:
+        path (str): Survey CSV or Parquet file
+        chunk_rows (int): Rows parsed per chunk
+
+    Returns:
+        dict: 'skill_map', 'unique_skills', 'names', 'emails' and 'skill_csr' (a dict
+              of 'indptr', 'indices', 'data' and 'shape')
+    """
+    if is_parquet(path):
+        parquet_file = pq.ParquetFile(path)
+        skill_map = group_skill_columns(parquet_file.schema_arrow.names)
+        columns = SUBMITTER_COLUMNS + [column for columns in skill_map.values() for column in columns]
+        chunks = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns))
+    else:
+        skill_map = group_skill_columns(pd.read_csv(path, nrows=0).columns)
+        columns = SUBMITTER_COLUMNS + [column for columns in skill_map.values() for column in columns]
+        dtypes = {column: np.float32 for column in columns[len(SUBMITTER_COLUMNS):]}
+        dtypes.update({column: str for column in SUBMITTER_COLUMNS})
+        chunks = pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows)
+
+    return _fold_skill_chunks(skill_map, chunks)
+
+# Function to fold survey chunks into canonical skills and CSR arrays
+def _fold_skill_chunks(skill_map, chunks):
+    skill_columns = [column for columns in skill_map.values() for column in columns]
+
+    # Skill columns are grouped by canonical skill; where each skill's columns start
+    group_sizes = [len(columns) for columns in skill_map.values()]
+    group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1])).astype(np.intp)
+
+    names, emails = [], []
+    indptr_parts, index_parts, value_parts = [np.zeros(1, dtype=np.int64)], [], []
+    entry_count = 0
+
+    for chunk in chunks:
+        names.extend(chunk['Submitter Name'].tolist())
+        emails.extend(chunk['Submitter Email'].tolist())
+
+        points = np.nan_to_num(chunk[skill_columns].to_numpy(dtype=np.float32), nan=0.0)
+        # The uint8 store holds whole points only
+        if np.any((points != np.rint(points)) | (points < 0) | (points > np.iinfo(SKILL_POINTS_DTYPE).max)):
+            raise ValueError("Skill points must be whole numbers from 0 to 255")
+        skill_points = np.maximum.reduceat(points, group_starts, axis=1) if skill_columns else points
+
+        rows, columns = np.nonzero(skill_points > 0)
+        row_counts = np.bincount(rows, minlength=len(chunk))
+        indptr_parts.append(entry_count + np.cumsum(row_counts))
+        index_parts.append(columns.astype(np.int32))
+        value_parts.append(skill_points[rows, columns].astype(SKILL_POINTS_DTYPE))
+        entry_count += len(rows)
+
+    skill_csr = {
+        'indptr': np.concatenate(indptr_parts),
+        'indices': np.concatenate(index_parts) if index_parts else np.zeros(0, dtype=np.int32),
+        'data': np.concatenate(value_parts) if value_parts else np.zeros(0, dtype=SKILL_POINTS_DTYPE),
+        'shape': (len(names), len(skill_map))
+    }
+
+    return {
+        'skill_map': skill_map,
+        'unique_skills': list(skill_map),
+        'names': names,
+        'emails': emails,
+        'skill_csr': skill_csr
+    }
+
+# Function to expand a CSR skill matrix into the dense (uint8) matrix used for scoring
+def csr_to_dense(skill_csr, dtype=SKILL_POINTS_DTYPE):
+    """
+    Builds the dense lawyers x skills matrix from CSR arrays. The whole matrix is
+    allocated at once (one byte per lawyer and skill with the default dtype).
+
+    Args:
+        skill_csr (dict): 'indptr', 'indices', 'data' and 'shape'
+        dtype: dtype of the dense matrix
+
+    Returns:
+        np.ndarray: Dense matrix (zero where the CSR has no entry)
+    """
+    matrix = np.zeros(skill_csr['shape'], dtype=dtype)
+    rows = np.repeat(np.arange(skill_csr['shape'][0]), np.diff(skill_csr['indptr']))
+    matrix[rows, skill_csr['indices']] = skill_csr['data']
+    return matrix
+
+# Function to read the bio export in chunks
+def read_bio_chunks(path, chunk_rows=INGEST_CHUNK_ROWS):
+    """
+    Reads the bio export (CSV or Parquet) chunk by chunk, reading only the bio
+    columns; repeated values (levels, jurisdictions, locations) are categoricals
+
+    Args:
+        path (str): Bio CSV or Parquet file
+        chunk_rows (int): Rows parsed per chunk
+
+    Returns:
+        iterator: DataFrame chunks with the columns of BIO_COLUMNS
+    """
+    if is_parquet(path):
+        parquet_file = pq.ParquetFile(path)
+        return (
+            batch.to_pandas()
+            for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=list(BIO_COLUMNS.values()))
+        )
+
+    dtypes = {column: str for column in BIO_COLUMNS.values()}
+    dtypes.update({column: 'category' for column in BIO_CATEGORICAL_COLUMNS})
+    return pd.read_csv(path, usecols=list(BIO_COLUMNS.values()), dtype=dtypes, chunksize=chunk_rows)
+
+# Function to process the biographical data, one chunk of the bio CSV at a time
+def process_bio_data(chunks):
+    lawyers_bio = {}
+    
+    for _, row in (row for df in chunks for row in df.iterrows()):
+        # Convert first and last names to string and handle NaN values
+        first_name = str(row['First Name']).strip() if pd.notna(row['First Name']) else ""
+        last_name = str(row['Last Name']).strip() if pd.notna(row['Last Name']) else ""
+        
+        full_name = f"{first_name} {last_name}".strip()
+        
+        # Skip empty names
+        if not full_name:
+            continue
+        
+        bio = {
+            'level': str(row['Level/Title']) if pd.notna(row['Level/Title']) else "",
+            'call': str(row['Call']) if pd.notna(row['Call']) else "",
+            'jurisdiction': str(row['Jurisdiction']) if pd.notna(row['Jurisdiction']) else "",
+            'location': str(row['Location']) if pd.notna(row['Location']) else "",
+            'practice_areas': str(row['Area of Practise + Add Info']) if pd.notna(row['Area of Practise + Add Info']) else "",
+            'industry_experience': str(row['Industry Experience']) if pd.notna(row['Industry Experience']) else "",
+            'languages': str(row['Languages']) if pd.notna(row['Languages']) else "",
+            'previous_in_house': str(row['Previous In-House Companies']) if pd.notna(row['Previous In-House Companies']) else "",
+            'previous_firms': str(row['Previous Companies/Firms']) if pd.notna(row['Previous Companies/Firms']) else "",
+            'education': str(row['Education']) if pd.notna(row['Education']) else "",
+            'awards': str(row['Awards/Recognition']) if pd.notna(row['Awards/Recognition']) else "",
+            'notable_items': str(row['Notable Items/Personal Details ']) if pd.notna(row['Notable Items/Personal Details ']) else "",
+            'expert': str(row['Expert']) if pd.notna(row['Expert']) else ""
+        }
+        
+        lawyers_bio[full_name] = bio
+    
+    return {
+        'lawyers_bio': lawyers_bio
+    }
+
+# Function to convert the CSV exports into Parquet roster sources
+def convert_roster_to_parquet(skills_csv=SKILLS_CSV, bio_csv=BIO_CSV,
+                              skills_parquet=SKILLS_PARQUET, bio_parquet=BIO_PARQUET,
+                              chunk_rows=INGEST_CHUNK_ROWS):
+    """
+    Writes the survey and bio CSVs as Parquet, one row group per chunk. Skill points
+    become nullable uint8 columns, the bio keeps only the bio columns, and repeated
+    bio values are dictionary-encoded. While both files are newer than their CSVs the
+    app loads them instead of the CSVs.
+
+    Args:
+        skills_csv (str): Survey CSV
+        bio_csv (str): Bio CSV
+        skills_parquet (str): Survey Parquet file to write
+        bio_parquet (str): Bio Parquet file to write
+        chunk_rows (int): Rows converted per chunk
+
+    Returns:
+        tuple: Paths of the written survey and bio files
+    """
+    skill_map = group_skill_columns(pd.read_csv(skills_csv, nrows=0).columns)
+    skill_columns = [column for columns in skill_map.values() for column in columns]
+    skills_schema = pa.schema(
+        [(column, pa.string()) for column in SUBMITTER_COLUMNS] +
+        [(column, pa.uint8()) for column in skill_columns]
+    )
+    dtypes = {column: np.float32 for column in skill_columns}
+    dtypes.update({column: str for column in SUBMITTER_COLUMNS})
+    csv_chunks = pd.read_csv(skills_csv, usecols=SUBMITTER_COLUMNS + skill_columns, dtype=dtypes, chunksize=chunk_rows)
+    _write_parquet(skills_parquet, skills_schema, (
+        chunk[SUBMITTER_COLUMNS + skill_columns].astype({column: 'UInt8' for column in skill_columns})
+        for chunk in csv_chunks
+    ))
+
+    bio_schema = pa.schema([
+        (column, pa.dictionary(pa.int32(), pa.string()) if column in BIO_CATEGORICAL_COLUMNS else pa.string())
+        for column in BIO_COLUMNS.values()
+    ])
+    _write_parquet(bio_parquet, bio_schema, (
+        chunk[list(BIO_COLUMNS.values())] for chunk in read_bio_chunks(bio_csv, chunk_rows)
+    ))
+
+    return skills_parquet, bio_parquet
+
+# Function to write DataFrame chunks to a Parquet file with a fixed schema
+def _write_parquet(path, schema, chunks):
+    # Written under a temporary name so a reader never sees a partial file
+    partial_path = f"{path}.partial"
+    with pq.ParquetWriter(partial_path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    os.replace(partial_path, path)
+
+if __name__ == "__main__":
+    for written_path in convert_roster_to_parquet():
+        print(f"Wrote {written_path}")
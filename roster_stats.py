@@ -0,0 +1,66 @@
+# Roster Statistics
+# This file computes the aggregates shown on the landing page (skill totals,
+# availability counts, facet histograms) once per roster version
+
+import numpy as np
+import pandas as pd
+
+from facets import FACET_FIELDS, facet_value_counts
+from roster_version import cached_per_roster_version
+
+# Availability statuses that count as "Currently Available" on the landing page
+CURRENTLY_AVAILABLE_STATUSES = ("Available Now", "Partially Available", "Available for Ad Hoc")
+
+# Number of skills shown in the landing page bar chart
+TOP_SKILLS_SHOWN = 20
+
+# Function to compute all landing page aggregates for a roster
+def compute_roster_stats(data):
+    """
+    Computes the roster aggregates from the skill matrix with column sums
+    
+    Args:
+        data (dict): The lawyer data structure, including 'skill_matrix'
+        
+    Returns:
+        dict: Skill totals and lawyer counts, availability counts, facet histograms
+              and the prepared top skills chart data
+    """
+    matrix = data['skill_matrix']
+    skills = np.asarray(data['unique_skills'], dtype=object)
+    
+    skill_totals = matrix.sum(axis=0, dtype=np.float64)
+    skill_lawyer_counts = np.count_nonzero(matrix, axis=0)
+    
+    # Stable sort keeps the vocabulary order between skills with equal totals
+    top_order = np.argsort(-skill_totals, kind='stable')[:TOP_SKILLS_SHOWN]
+    top_skills_chart = pd.DataFrame({
+        'Skill': skills[top_order],
+        'Total Points': skill_totals[top_order]
+    }).set_index('Skill')
+    
+    statuses, status_counts = np.unique(
+        np.asarray([lawyer['availability'] for lawyer in data['lawyers']], dtype=object).astype(str),
+        return_counts=True
+    )
+    availability_counts = dict(zip(statuses.tolist(), status_counts.tolist()))
+    
+    facet_histograms = {}
+    if 'facet_index' in data:
+        facet_histograms = {
+            facet: facet_value_counts(data['facet_index'], facet) for facet in FACET_FIELDS
+        }
+    
+    return {
+        'total_lawyers': len(data['lawyers']),
+        'total_skills': len(data['unique_skills']),
+        'skill_totals': dict(zip(data['unique_skills'], skill_totals.tolist())),
+        'skill_lawyer_counts': dict(zip(data['unique_skills'], skill_lawyer_counts.tolist())),
+        'top_skills_chart': top_skills_chart,
+        'availability_counts': availability_counts,
+        'currently_available': sum(availability_counts.get(status, 0) for status in CURRENTLY_AVAILABLE_STATUSES),
+        'facet_histograms': facet_histograms
+    }
+
+# Function to get the cached aggregates for the current roster version
+get_roster_stats = cached_per_roster_version("roster_stats", compute_roster_stats)
@@ -0,0 +1,93 @@
+# Roster Status
+# This file assigns every lawyer a roster status (active, test or inactive) from the
+# roster status file and turns it into the boolean mask the matchers apply, so test
+# and departed users are listed in data rather than matched by name in code
+
+import csv
+import os
+
+import numpy as np
+
+from roster_version import ROSTER_STATUS_FILE
+
+# Statuses a roster status file may assign; only active lawyers are matched
+ROSTER_STATUSES = ("active", "test", "inactive")
+
+# Status of lawyers the file does not list
+DEFAULT_STATUS = "active"
+
+# Function to build the matching key of a name or email
+def status_key(value):
+    """
+    Lowercases and collapses whitespace so listed names and emails match the survey
+    entries regardless of case and stray spaces
+
+    Args:
+        value (str): Name or email
+
+    Returns:
+        str: Normalised key
+    """
+    return " ".join(str(value or "").lower().split())
+
+# Function to read the roster status file
+def load_status_rules(path=ROSTER_STATUS_FILE):
+    """
+    Reads the roster status file: a CSV with name, email and status columns (plus
+    free-text notes). A row applies to the lawyer with that email when one is given,
+    otherwise to the lawyer with that exact name.
+
+    Args:
+        path (str): Roster status file
+
+    Returns:
+        tuple: ({name key: status}, {email key: status}); both empty when the file
+               does not exist, which leaves every lawyer active
+    """
+    by_name, by_email = {}, {}
+    if not os.path.exists(path):
+        return by_name, by_email
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for line_number, row in enumerate(csv.DictReader(f), start=2):
+            status = status_key(row.get('status'))
+            if status not in ROSTER_STATUSES:
+                raise ValueError(f"{path}:{line_number}: unknown roster status {row.get('status')!r}")
+            if status_key(row.get('email')):
+                by_email[status_key(row['email'])] = status
+            elif status_key(row.get('name')):
+                by_name[status_key(row['name'])] = status
+
+    return by_name, by_email
+
+# Function to look up the status of every lawyer
+def lawyer_statuses(lawyers, path=ROSTER_STATUS_FILE):
+    """
+    Returns the roster status of each lawyer, in roster order
+
+    Args:
+        lawyers (list): Lawyer profiles
+        path (str): Roster status file
+
+    Returns:
+        list: Status strings
+    """
+    by_name, by_email = load_status_rules(path)
+    return [
+        by_email.get(status_key(lawyer['email'])) or by_name.get(status_key(lawyer['name']), DEFAULT_STATUS)
+        for lawyer in lawyers
+    ]
+
+# Function to build the active-lawyer mask
+def build_active_mask(lawyers, path=ROSTER_STATUS_FILE):
+    """
+    Marks the lawyers that may appear in search results
+
+    Args:
+        lawyers (list): Lawyer profiles
+        path (str): Roster status file
+
+    Returns:
+        np.ndarray: Boolean mask over the roster, True for active lawyers
+    """
+    return np.array([status == "active" for status in lawyer_statuses(lawyers, path)], dtype=bool)
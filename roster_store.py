@@ -0,0 +1,356 @@
+# Shared Roster Store
+# This file publishes the processed roster once to memory-mapped files so every
+# Streamlit server process and batch job can attach to the same pages read-only
+# instead of rebuilding their own copy from the CSVs
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from lawyer_profile import LawyerProfile, LazyBioRecord, SkillVector, SkillVocabulary
+
+# Directory holding the published roster versions; an empty value disables the store.
+# The default is in the user's own cache directory: a shared temp path could be
+# pre-created or written to by another user.
+ROSTER_STORE_DIR = os.environ.get(
+    "ROSTER_STORE_DIR",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "legal_expert_finder", "roster"
+    )
+)
+
+# File naming the currently published version, swapped atomically on publish
+CURRENT_POINTER = "CURRENT"
+
+# Bumped whenever the on-disk layout changes
+STORE_FORMAT = 5
+
+# Lawyer fields holding a string (or None), stored as string-table ids (-1 for None)
+LAWYER_STRING_FIELDS = [
+    'name', 'email', 'availability', 'hours_available', 'engagement_note',
+    'practice_area', 'billable_rate', 'last_client'
+]
+
+# Class interning strings into one table of UTF-8 bytes with an offsets array
+class StringTableBuilder:
+    """
+    Collects distinct strings and assigns each an id
+    """
+
+    def __init__(self):
+        self._ids = {}
+
+    def add(self, value):
+        """
+        Returns the id of a string, adding it to the table if needed (-1 for None)
+        """
+        if value is None:
+            return -1
+        return self._ids.setdefault(str(value), len(self._ids))
+
+    def write(self, directory):
+        """
+        Writes strings.bin (concatenated UTF-8) and string_offsets.npy (n + 1 offsets)
+        """
+        encoded = [value.encode("utf-8") for value in self._ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        with open(os.path.join(directory, "strings.bin"), "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(directory, "string_offsets.npy"), offsets)
+
+# Class reading strings from a published, memory-mapped string table
+class StringTable:
+    """
+    Read-only view of strings.bin; strings are decoded on access
+    """
+
+    def __init__(self, directory):
+        self.offsets = np.load(os.path.join(directory, "string_offsets.npy"), mmap_mode="r")
+        path = os.path.join(directory, "strings.bin")
+        # np.memmap cannot map an empty file
+        if os.path.getsize(path):
+            self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, string_id):
+        """
+        Returns the string with the given id (None for -1)
+        """
+        if string_id < 0:
+            return None
+        start, end = self.offsets[string_id], self.offsets[string_id + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+# Class giving field access to the bio string ids of every lawyer
+class BioTable:
+    """
+    Lawyers x bio fields matrix of string-table ids (-1 where a field is missing),
+    decoded one field at a time
+    """
+
+    def __init__(self, strings, fields, ids):
+        """
+        Args:
+            strings (StringTable): String table the ids point into
+            fields (list): Bio field names, in column order
+            ids (np.ndarray): Memory-mapped lawyers x fields id matrix
+        """
+        self.strings = strings
+        self.fields = list(fields)
+        self.columns = {field: column for column, field in enumerate(self.fields)}
+        self.ids = ids
+
+    def text(self, row, field):
+        """
+        Returns the text of one bio field of one lawyer (None when missing)
+        """
+        column = self.columns.get(field)
+        if column is None:
+            return None
+        return self.strings.get(self.ids[row, column])
+
+    def row_fields(self, row):
+        """
+        Returns the bio fields present for one lawyer
+        """
+        return [field for field, string_id in zip(self.fields, self.ids[row]) if string_id >= 0]
+
+# Function to build the CSR arrays of a list of per-lawyer lists
+def _csr(rows):
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    values = [value for row in rows for value in row]
+    return indptr, values
+
+# Function to read the currently published roster version
+def current_roster_version(store_dir=ROSTER_STORE_DIR):
+    """
+    Returns the version named by the CURRENT pointer
+
+    Args:
+        store_dir (str): Roster store directory
+
+    Returns:
+        str: Published version, or None when nothing has been published
+    """
+    try:
+        with open(os.path.join(store_dir, CURRENT_POINTER), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+# Function to publish a processed roster to the store
+def publish_roster(data, store_dir=ROSTER_STORE_DIR):
+    """
+    Writes the roster (skill matrix, lawyer tables, string table, facet index, active
+    mask) to a version directory and points CURRENT at it. The directory is completed under a
+    temporary name and renamed into place, and CURRENT is swapped with os.replace, so
+    readers never see a partly written roster. Processes still attached to an older
+    version keep their mappings.
+
+    Args:
+        data (dict): The lawyer data structure, including 'roster_version'
+        store_dir (str): Roster store directory
+
+    Returns:
+        str: Path of the published version directory
+    """
+    version = data['roster_version']
+    version_dir = os.path.join(store_dir, version)
+    # Readable by this user only
+    os.makedirs(store_dir, mode=0o700, exist_ok=True)
+
+    if not os.path.isdir(version_dir):
+        staging_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=store_dir)
+        try:
+            _write_roster(data, staging_dir)
+            os.rename(staging_dir, version_dir)
+        except OSError:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            # Another process published the same version first
+            if not os.path.isdir(version_dir):
+                raise
+
+    pointer_fd, pointer_path = tempfile.mkstemp(prefix=".current-", dir=store_dir)
+    with os.fdopen(pointer_fd, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer_path, os.path.join(store_dir, CURRENT_POINTER))
+
+    # Drop older versions; mapped files stay readable until their readers let go
+    for entry in os.listdir(store_dir):
+        path = os.path.join(store_dir, entry)
+        if entry != version and not entry.startswith(".") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+    return version_dir
+
+# Function to write the roster files into a directory
+def _write_roster(data, directory):
+    lawyers = data['lawyers']
+    strings = StringTableBuilder()
+
+    string_fields = np.array(
+        [[strings.add(lawyer.get(field)) for field in LAWYER_STRING_FIELDS] for lawyer in lawyers],
+        dtype=np.int64
+    ).reshape(len(lawyers), len(LAWYER_STRING_FIELDS))
+    days_available = np.array(
+        [-1 if lawyer.get('days_available') is None else lawyer['days_available'] for lawyer in lawyers],
+        dtype=np.int64
+    )
+
+    # Skills keep each lawyer's own order, which the matchers iterate in
+    skill_columns = {skill: column for column, skill in enumerate(data['unique_skills'])}
+    skill_indptr, skill_entries = _csr([list(lawyer['skills'].items()) for lawyer in lawyers])
+    skill_ids = np.array([skill_columns[skill] for skill, _ in skill_entries], dtype=np.int32)
+    skill_values = np.array([value for _, value in skill_entries], dtype=np.uint8)
+
+    vacation_indptr, vacation_entries = _csr([
+        lawyer['vacation'] if isinstance(lawyer['vacation'], (list, tuple)) else [lawyer['vacation']] if lawyer['vacation'] else []
+        for lawyer in lawyers
+    ])
+    vacation_ids = np.array([strings.add(value) for value in vacation_entries], dtype=np.int64)
+
+    bio_fields = []
+    for lawyer in lawyers:
+        for field in (lawyer.get('bio') or {}):
+            if field not in bio_fields:
+                bio_fields.append(field)
+    bio_ids = np.array(
+        [[strings.add((lawyer.get('bio') or {}).get(field)) for field in bio_fields] for lawyer in lawyers],
+        dtype=np.int64
+    ).reshape(len(lawyers), len(bio_fields))
+
+    facet_index = data['facet_index']
+    facets = {}
+    bitmaps = []
+    for facet, entry in facet_index.items():
+        if facet == "size":
+            continue
+        facets[facet] = []
+        for key, bitmap in entry['bitmaps'].items():
+            facets[facet].append([key, entry['labels'][key], entry['counts'][key], len(bitmaps)])
+            bitmaps.append(bitmap)
+    facet_bitmaps = np.array(bitmaps, dtype=bool).reshape(len(bitmaps), facet_index['size'])
+
+    np.save(os.path.join(directory, "skill_matrix.npy"), np.ascontiguousarray(data['skill_matrix']))
+    np.save(os.path.join(directory, "lawyer_strings.npy"), string_fields)
+    np.save(os.path.join(directory, "days_available.npy"), days_available)
+    np.save(os.path.join(directory, "skill_indptr.npy"), skill_indptr)
+    np.save(os.path.join(directory, "skill_ids.npy"), skill_ids)
+    np.save(os.path.join(directory, "skill_values.npy"), skill_values)
+    np.save(os.path.join(directory, "vacation_indptr.npy"), vacation_indptr)
+    np.save(os.path.join(directory, "vacation_ids.npy"), vacation_ids)
+    np.save(os.path.join(directory, "bio_ids.npy"), bio_ids)
+    np.save(os.path.join(directory, "facet_bitmaps.npy"), facet_bitmaps)
+    np.save(os.path.join(directory, "active_mask.npy"), np.asarray(data['active_mask'], dtype=bool))
+    strings.write(directory)
+
+    manifest = {
+        "format": STORE_FORMAT,
+        "roster_version": data['roster_version'],
+        "lawyer_count": len(lawyers),
+        "bio_fields": bio_fields,
+        "skill_map": data['skill_map'],
+        "facet_size": facet_index['size'],
+        "facets": facets
+    }
+    # Written last: a directory without a manifest is never attached
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+# Function to attach to a published roster
+def attach_roster(roster_version=None, store_dir=ROSTER_STORE_DIR):
+    """
+    Loads a published roster with every array memory-mapped read-only
+
+    Args:
+        roster_version (str): Version to attach (defaults to the CURRENT one)
+        store_dir (str): Roster store directory
+
+    Returns:
+        dict: The lawyer data structure, or None when that version is not published
+    """
+    roster_version = roster_version or current_roster_version(store_dir)
+    if not roster_version:
+        return None
+
+    directory = os.path.join(store_dir, roster_version)
+    try:
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != STORE_FORMAT or manifest.get("roster_version") != roster_version:
+        return None
+
+    try:
+        return _read_roster(directory, manifest)
+    except (OSError, ValueError):
+        # The version was replaced and removed while attaching
+        return None
+
+# Function to read the roster files of a version directory
+def _read_roster(directory, manifest):
+    def load(name):
+        return np.load(os.path.join(directory, name), mmap_mode="r")
+
+    roster_version = manifest['roster_version']
+    strings = StringTable(directory)
+    unique_skills = list(manifest['skill_map'])
+    string_fields = load("lawyer_strings.npy")
+    days_available = load("days_available.npy")
+    skill_indptr, skill_ids, skill_values = load("skill_indptr.npy"), load("skill_ids.npy"), load("skill_values.npy")
+    vacation_indptr, vacation_ids = load("vacation_indptr.npy"), load("vacation_ids.npy")
+    # Bio text is the bulk of the strings; it is only decoded when a field is read
+    bio_table = BioTable(strings, manifest['bio_fields'], load("bio_ids.npy"))
+
+    # Repeated values (statuses, rates, vacation dates) decode to one shared string
+    decoded = {}
+    def text(string_id):
+        value = decoded.get(string_id)
+        if value is None and string_id >= 0:
+            value = decoded[string_id] = strings.get(string_id)
+        return value
+
+    vocabulary = SkillVocabulary(unique_skills)
+    lawyers = []
+    for row in range(manifest['lawyer_count']):
+        fields = {field: text(string_fields[row, column]) for column, field in enumerate(LAWYER_STRING_FIELDS)}
+        skill_start, skill_end = skill_indptr[row], skill_indptr[row + 1]
+        vacation_start, vacation_end = vacation_indptr[row], vacation_indptr[row + 1]
+
+        lawyers.append(LawyerProfile(
+            skills=SkillVector(vocabulary, skill_ids[skill_start:skill_end], skill_values[skill_start:skill_end]),
+            days_available=None if days_available[row] < 0 else int(days_available[row]),
+            vacation=[text(string_id) for string_id in vacation_ids[vacation_start:vacation_end]],
+            bio=LazyBioRecord(bio_table, row),
+            **fields
+        ))
+
+    facet_bitmaps = load("facet_bitmaps.npy")
+    facet_index = {"size": manifest['facet_size']}
+    for facet, values in manifest['facets'].items():
+        facet_index[facet] = {
+            "labels": {key: label for key, label, _, _ in values},
+            "bitmaps": {key: facet_bitmaps[row] for key, _, _, row in values},
+            "counts": {key: count for key, _, count, _ in values}
+        }
+
+    return {
+        'lawyers': lawyers,
+        'skill_map': manifest['skill_map'],
+        'unique_skills': unique_skills,
+        'facet_index': facet_index,
+        'skill_matrix': load("skill_matrix.npy"),
+        'active_mask': load("active_mask.npy"),
+        'roster_version': roster_version
+    }
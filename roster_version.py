@@ -0,0 +1,154 @@
+# Roster Versioning
+# This file computes a version stamp for the roster source files so that caches
+# built from the roster can be keyed on it and dropped when the data changes
+
+import hashlib
+import os
+import threading
+
+from skill_taxonomy import taxonomy_fingerprint
+
+# Source files the roster is built from
+SKILLS_CSV = 'combined_unique.csv'
+BIO_CSV = 'BD_Caravel.csv'
+
+# Roster status of listed lawyers (test and inactive users), see roster_status.py
+ROSTER_STATUS_FILE = 'roster_status.csv'
+
+# Modules whose code shapes the roster: availability notes and demo fields (main.py),
+# ingestion, taxonomy, profiles, facets, status rules and the store layout. The
+# published store outlives restarts, so a code change must give the roster a new
+# version too.
+ROSTER_CODE_FILES = [
+    'main.py', 'roster_ingest.py', 'skill_taxonomy.py', 'lawyer_profile.py',
+    'facets.py', 'roster_status.py', 'roster_store.py'
+]
+
+# Columnar conversions of the source files (written by roster_ingest.py), preferred
+# over the CSVs while both exist and are up to date
+SKILLS_PARQUET = 'combined_unique.parquet'
+BIO_PARQUET = 'BD_Caravel.parquet'
+
+# Function to check whether a converted file is at least as new as its source
+def is_up_to_date(converted_path, source_path):
+    """
+    Returns whether a converted file exists and was written no earlier than its
+    source was last modified (a missing source counts as up to date)
+    """
+    try:
+        converted_mtime = os.stat(converted_path).st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return converted_mtime >= os.stat(source_path).st_mtime_ns
+    except OSError:
+        return True
+
+# Function to choose the roster source files
+def roster_sources():
+    """
+    Returns the survey and bio files to load: the Parquet pair when both exist and
+    neither CSV has changed since it was converted, otherwise the CSVs (an updated
+    CSV export is never shadowed by an old conversion; rerun roster_ingest.py to
+    convert it again)
+    
+    Returns:
+        tuple: (survey path, bio path)
+    """
+    if is_up_to_date(SKILLS_PARQUET, SKILLS_CSV) and is_up_to_date(BIO_PARQUET, BIO_CSV):
+        return SKILLS_PARQUET, BIO_PARQUET
+    return SKILLS_CSV, BIO_CSV
+
+# Content digests of the code files, keyed by path, size and modification time
+_code_digests = {}
+
+# Function to fingerprint the code the roster is built with
+def code_fingerprint(files=ROSTER_CODE_FILES):
+    """
+    Returns a short digest of the contents of the roster-building modules (each file
+    is only re-read when its size or modification time changes)
+
+    Args:
+        files (list): Code files, relative to this module's directory
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha1()
+    for name in files:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest.update(f"{name}:missing;".encode())
+            continue
+
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        file_digest = _code_digests.get(key)
+        if file_digest is None:
+            with open(path, "rb") as f:
+                file_digest = hashlib.sha1(f.read()).hexdigest()
+            _code_digests[key] = file_digest
+        digest.update(f"{name}:{file_digest};".encode())
+    return digest.hexdigest()[:12]
+
+# Function to compute the version stamp of the roster source files
+def compute_roster_version(*paths):
+    """
+    Computes a short version stamp from the size and modification time of each source
+    file, the skill taxonomy rules and the code the roster is built with
+    
+    Args:
+        *paths (str): Roster source files (defaults to both CSVs, the Parquet files
+                      when roster_sources() picks them, and the status file)
+        
+    Returns:
+        str: Hex digest that changes whenever any source file, the taxonomy or the
+             roster-building code changes
+    """
+    digest = hashlib.sha1()
+    digest.update(f"taxonomy:{taxonomy_fingerprint()};".encode())
+    digest.update(f"code:{code_fingerprint()};".encode())
+    
+    # The CSVs always count, so a new export changes the version even while Parquet
+    # files are present
+    default_paths = dict.fromkeys((SKILLS_CSV, BIO_CSV, *roster_sources(), ROSTER_STATUS_FILE))
+    for path in paths or default_paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            # A missing file is still part of the version so it is picked up once it appears
+            digest.update(f"{path}:missing;".encode())
+    
+    return digest.hexdigest()[:12]
+
+# Function to wrap a builder so it runs once per roster version
+def cached_per_roster_version(name, builder):
+    """
+    Returns a getter that builds a value from the roster data once per roster version.
+    Only the current version's value is kept: the first call with a new version
+    replaces it. Builds are serialised by a lock of the getter's own.
+
+    Args:
+        name (str): What is cached, used to name the getter
+        builder (callable): Builds the value from the lawyer data structure
+
+    Returns:
+        callable: Getter taking the lawyer data structure (including 'roster_version')
+    """
+    cache = {}
+    lock = threading.Lock()
+
+    def get(data):
+        version = data.get('roster_version')
+        with lock:
+            if version not in cache:
+                value = builder(data)
+                cache.clear()
+                cache[version] = value
+            return cache[version]
+
+    get.__name__ = get.__qualname__ = f"get_{name}"
+    get.__doc__ = f"Returns the {name.replace('_', ' ')}, built once per roster version"
+    return get
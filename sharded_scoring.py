@@ -0,0 +1,260 @@
+# Sharded Multi-Process Scoring
+# This file spreads the batched ranking over worker processes: the skill matrix is
+# placed in shared memory once, each worker owns a block of roster rows, and only the
+# query strength vectors travel to the workers
+
+import atexit
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_ranking import (
+    build_batch_results, eligible_lawyers, get_ranking_index, integer_domain_scores, score_queries, top_n_indices
+)
+from domain_batch import domain_strength_matrix
+
+# Number of scoring processes; 0 keeps scoring in the calling process
+SCORING_WORKERS = int(os.environ.get("SCORING_WORKERS", "0"))
+
+# The scorer of the current roster version, shared by all sessions
+_current_scorer = None
+_current_scorer_lock = threading.Lock()
+
+# Function run by each worker process
+def _shard_worker(connection, parent_ends, shm_name, shape, dtype, row_start, row_end, weights, eligible):
+    """
+    Attaches to the shared skill matrix, precomputes the domain scores of its rows and
+    answers scoring requests until it receives None or the parent goes away
+
+    Args:
+        connection (Connection): Pipe end to the parent process
+        parent_ends (list): Parent pipe ends inherited from the parent, closed at once
+                            so the pipe reports EOF when the parent exits
+        shm_name (str): Name of the shared-memory block holding the skill matrix
+        shape (tuple): Shape of the full skill matrix
+        dtype (str): dtype of the skill matrix
+        row_start (int): First roster row owned by this worker
+        row_end (int): End (exclusive) of the owned rows
+        weights (np.ndarray): domain x skill weights
+        eligible (np.ndarray): Active-lawyer mask for the owned rows
+    """
+    for parent_end in parent_ends:
+        parent_end.close()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        skill_matrix = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        domain_scores = integer_domain_scores(weights, skill_matrix[row_start:row_end])
+
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            strengths, facet_mask, top_n = request
+
+            shard_eligible = eligible if facet_mask is None else eligible & facet_mask[row_start:row_end]
+            scores = score_queries(strengths, domain_scores, shard_eligible)
+
+            # Best first, as (-score, roster row) so shard lists merge in global order
+            connection.send([
+                [(-scores[query_row, column], row_start + column) for column in columns]
+                for query_row, columns in enumerate(top_n_indices(scores, top_n))
+            ])
+    finally:
+        connection.close()
+        shm.close()
+
+# Class running the batched ranking over roster shards in worker processes
+class ShardedScorer:
+    """
+    Pool of scoring processes over one roster version. Use as a context manager, or
+    call close() to stop the workers and release the shared memory.
+    """
+
+    def __init__(self, data, workers=None):
+        """
+        Publishes the skill matrix to shared memory and starts one worker per shard
+
+        Args:
+            data (dict): The lawyer data structure, including 'skill_matrix'
+            workers (int): Number of worker processes (defaults to the CPU count)
+        """
+        self.data = data
+        self.roster_version = data.get('roster_version')
+        index = get_ranking_index(data)
+
+        skill_matrix = np.ascontiguousarray(data['skill_matrix'])
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, skill_matrix.nbytes))
+        np.ndarray(skill_matrix.shape, dtype=skill_matrix.dtype, buffer=self._shm.buf)[:] = skill_matrix
+
+        lawyer_count = skill_matrix.shape[0]
+        workers = max(1, min(workers or os.cpu_count() or 1, lawyer_count))
+        bounds = np.linspace(0, lawyer_count, workers + 1).astype(int)
+
+        # fork where available. spawn and forkserver children re-import the parent's
+        # __main__, which under Streamlit is the app script, so every worker would load
+        # the roster and run the page. Forking the threaded server is safe for these
+        # workers: they only run _shard_worker, which imports nothing new and takes no
+        # lock another thread could hold (CPython resets the GIL and import lock in the
+        # child), and they only talk to the parent over their pipe, exiting on EOF when
+        # the parent goes away
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(start_method)
+        # One request at a time on the pipes (Streamlit sessions share the scorer)
+        self._lock = threading.Lock()
+        self._connections = []
+        self._processes = []
+        for row_start, row_end in zip(bounds[:-1], bounds[1:]):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_end, self._connections + [parent_end], self._shm.name, skill_matrix.shape,
+                      skill_matrix.dtype.str, int(row_start), int(row_end), index['weights'],
+                      index['eligible'][row_start:row_end]),
+                daemon=True
+            )
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+
+    def rank(self, queries, top_n=5, facet_filters=None):
+        """
+        Sharded rank_lawyers_batch: every shard returns its own top N for each query
+        and the shard lists are merged with a heap
+
+        Args:
+            queries (list): Search queries
+            top_n (int): Number of top matches to return per query
+            facet_filters (dict): Optional facet selections applied to every query
+
+        Returns:
+            list: One list of matches per query, as rank_lawyers_batch returns them
+
+        Raises:
+            RuntimeError: When the scorer is closed or a worker has exited; the scorer
+                          is closed in the latter case
+        """
+        if not queries:
+            return []
+
+        strengths = domain_strength_matrix(queries)
+        facet_mask = None
+        if facet_filters:
+            index = get_ranking_index(self.data)
+            facet_mask = eligible_lawyers(self.data, index, facet_filters)
+
+        with self._lock:
+            if not self._connections:
+                raise RuntimeError("ShardedScorer is closed")
+            try:
+                for connection in self._connections:
+                    connection.send((strengths, facet_mask, top_n))
+                shard_results = [connection.recv() for connection in self._connections]
+            except (EOFError, OSError) as e:
+                # A worker died: the surviving shards' answers can no longer be paired
+                # with a request, so the whole pool is stopped
+                failure = e
+            else:
+                failure = None
+
+        if failure is not None:
+            self.close()
+            raise RuntimeError(f"A scoring worker exited unexpectedly: {failure!r}") from failure
+
+        selections = []
+        for query_row in range(len(queries)):
+            merged = list(itertools.islice(
+                heapq.merge(*(shard[query_row] for shard in shard_results)), top_n
+            ))
+            selections.append(([row for _, row in merged], [-score for score, _ in merged]))
+
+        return build_batch_results(self.data, queries, strengths, selections, top_n, facet_filters)
+
+    @property
+    def closed(self):
+        return not self._connections
+
+    def close(self):
+        """
+        Stops the workers and releases the shared skill matrix
+        """
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                connection.close()
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._connections = []
+            self._processes = []
+
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Function to rank queries with the worker pool of the current roster version
+def rank_lawyers_sharded(data, queries, top_n=5, facet_filters=None, workers=SCORING_WORKERS):
+    """
+    Ranks queries with a shared ShardedScorer, started on first use. When the roster
+    version changes, the previous scorer's workers are stopped and its shared memory
+    unlinked before the new one starts. A request that finds a worker dead raises
+    RuntimeError, and the next request starts a fresh pool.
+
+    Args:
+        data (dict): The lawyer data structure, including 'roster_version'
+        queries (list): Search queries
+        top_n (int): Number of top matches to return per query
+        facet_filters (dict): Optional facet selections applied to every query
+        workers (int): Number of worker processes
+
+    Returns:
+        list: One list of matches per query, as rank_lawyers_batch returns them
+    """
+    global _current_scorer
+
+    # Held while ranking too, so a scorer is never closed under a running request
+    # (the scorer serialises requests on its pipes anyway)
+    with _current_scorer_lock:
+        # A scorer that lost a worker has closed itself and is replaced
+        if (_current_scorer is None or _current_scorer.closed
+                or _current_scorer.roster_version != data.get('roster_version')):
+            if _current_scorer is not None:
+                _current_scorer.close()
+                _current_scorer = None
+            _current_scorer = ShardedScorer(data, workers=workers)
+        return _current_scorer.rank(queries, top_n, facet_filters)
+
+# Function to stop the shared scorer
+def close_sharded_scorer():
+    """
+    Stops the shared scorer's workers and releases its shared memory, if it is running
+    """
+    global _current_scorer
+
+    with _current_scorer_lock:
+        if _current_scorer is not None:
+            _current_scorer.close()
+            _current_scorer = None
+
+# The shared memory block outlives the process unless it is unlinked
+atexit.register(close_sharded_scorer)
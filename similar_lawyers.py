@@ -0,0 +1,176 @@
+# Similar Lawyers
+# This file finds the lawyers whose skill profiles are closest to a given lawyer
+# (cosine similarity over the lawyer x skill vectors), so coordinators can find
+# substitutes for someone who is away. Neighbour lists are computed once per roster
+# version.
+
+import numpy as np
+
+from roster_version import cached_per_roster_version
+
+# Neighbours kept per lawyer; more than are shown, so the availability filter
+# rarely runs short
+SIMILAR_LAWYERS_STORED = 20
+
+# Rosters above this size keep only the normalised vectors and answer each request
+# with one exact matrix-vector product instead of precomputing every list
+SIMILARITY_PRECOMPUTE_LIMIT = 20000
+
+# Rows of the similarity matrix computed at a time while precomputing
+SIMILARITY_BLOCK_ROWS = 2048
+
+# Availability statuses (or parts of them) meaning a lawyer cannot take new work,
+# as the result cards mark them
+UNAVAILABLE_MARKERS = ("Limited", "Vacation", "Not Available")
+
+# Number of shared skills listed for each similar lawyer
+SHARED_SKILLS_SHOWN = 5
+
+# Function to check whether an availability status rules a lawyer out
+def is_unavailable(availability):
+    return any(marker in (availability or "") for marker in UNAVAILABLE_MARKERS)
+
+# Function to rank the neighbours of a block of lawyers
+def _nearest(similarities, rows, candidates, count):
+    """
+    Picks the most similar candidates of each row
+
+    Args:
+        similarities (np.ndarray): block x lawyers cosine similarities
+        rows (np.ndarray): Roster row of each block row (left out of its own list)
+        candidates (np.ndarray): Boolean mask of lawyers that may be returned
+        count (int): Neighbours kept per row
+
+    Returns:
+        list: One (neighbour rows, similarities) pair per block row, most similar
+              first, ties by roster order
+    """
+    similarities = np.where(candidates & (similarities > 0), similarities, -np.inf)
+    similarities[np.arange(len(rows)), rows] = -np.inf
+
+    results = []
+    for row_similarities in similarities:
+        columns = np.flatnonzero(np.isfinite(row_similarities))
+        if len(columns) > count:
+            columns = columns[np.argpartition(-row_similarities[columns], count - 1)[:count]]
+        order = np.lexsort((columns, -row_similarities[columns]))
+        results.append((columns[order], row_similarities[columns[order]]))
+    return results
+
+# Function to build the similarity index for a roster
+def build_similarity_index(data):
+    """
+    Normalises the skill vectors and, for rosters up to SIMILARITY_PRECOMPUTE_LIMIT,
+    precomputes every lawyer's nearest active neighbours
+
+    Args:
+        data (dict): The lawyer data structure, including 'skill_matrix' and 'active_mask'
+
+    Returns:
+        dict: 'vectors' (unit-length skill vectors), 'active' and 'available' masks,
+              'rows' ((name, email) to roster row) and 'neighbours' (per lawyer,
+              (rows, similarities); None when answered on demand)
+    """
+    vectors = np.asarray(data['skill_matrix'], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    lawyers = data['lawyers']
+    active = np.array(data['active_mask'], dtype=bool)
+    available = np.array([not is_unavailable(lawyer['availability']) for lawyer in lawyers], dtype=bool)
+
+    rows = {}
+    for row, lawyer in enumerate(lawyers):
+        rows.setdefault((lawyer['name'], lawyer['email']), row)
+
+    neighbours = None
+    if len(lawyers) <= SIMILARITY_PRECOMPUTE_LIMIT:
+        neighbours = []
+        for start in range(0, len(lawyers), SIMILARITY_BLOCK_ROWS):
+            block_rows = np.arange(start, min(start + SIMILARITY_BLOCK_ROWS, len(lawyers)))
+            neighbours.extend(_nearest(vectors[block_rows] @ vectors.T, block_rows, active, SIMILAR_LAWYERS_STORED))
+
+    return {
+        'vectors': vectors,
+        'active': active,
+        'available': available,
+        'rows': rows,
+        'neighbours': neighbours
+    }
+
+# Function to get the cached similarity index for the current roster version
+get_similarity_index = cached_per_roster_version("similarity_index", build_similarity_index)
+
+# Function to find the roster row of a lawyer profile
+def lawyer_row(data, lawyer):
+    """
+    Returns the roster row of a lawyer, or None when the lawyer is not in the roster
+    """
+    return get_similarity_index(data)['rows'].get((lawyer['name'], lawyer['email']))
+
+# Main function to find the lawyers most similar to a given lawyer
+def find_similar_lawyers(data, row, k=5, available_only=True):
+    """
+    Finds the active lawyers whose skill vectors are closest (cosine similarity) to
+    the lawyer at a roster row
+
+    Args:
+        data (dict): The lawyer data structure
+        row (int): Roster row of the lawyer to match
+        k (int): Number of similar lawyers to return
+        available_only (bool): Leave out lawyers who are on vacation or have limited
+                               or no availability
+
+    Returns:
+        list: (roster row, similarity) pairs, most similar first
+    """
+    index = get_similarity_index(data)
+    candidates = index['active'] & index['available'] if available_only else index['active']
+
+    if index['neighbours'] is not None:
+        neighbour_rows, similarities = index['neighbours'][row]
+        keep = candidates[neighbour_rows]
+        # The stored list is long enough unless filtering removed too many of a full list
+        if keep.sum() >= k or len(neighbour_rows) < SIMILAR_LAWYERS_STORED:
+            return [(int(r), float(s)) for r, s in zip(neighbour_rows[keep][:k], similarities[keep][:k])]
+
+    similarities = index['vectors'][row:row + 1] @ index['vectors'].T
+    neighbour_rows, row_similarities = _nearest(similarities, np.array([row]), candidates, k)[0]
+    return [(int(r), float(s)) for r, s in zip(neighbour_rows, row_similarities)]
+
+# Function to present similar lawyers as matches for the result cards
+def similar_lawyer_matches(data, lawyer, k=5, available_only=True):
+    """
+    Builds match dicts (as the matchers return them) for the lawyers most similar
+    to a lawyer, listing the skills each shares with that lawyer
+
+    Args:
+        data (dict): The lawyer data structure
+        lawyer (dict): Lawyer profile to find substitutes for
+        k (int): Number of similar lawyers
+        available_only (bool): Leave out lawyers without availability
+
+    Returns:
+        list: Match dicts, most similar first, with the cosine similarity as 'score'
+    """
+    row = lawyer_row(data, lawyer)
+    if row is None:
+        return []
+
+    lawyers = data['lawyers']
+    matches = []
+    for neighbour_row, similarity in find_similar_lawyers(data, row, k, available_only):
+        neighbour = lawyers[neighbour_row]
+        shared_skills = [
+            {"skill": skill, "value": value}
+            for skill, value in neighbour['skills'].top()
+            if skill in lawyer['skills']
+        ][:SHARED_SKILLS_SHOWN]
+        matches.append({
+            'lawyer': neighbour,
+            'score': similarity,
+            'matched_skills': shared_skills,
+            'matched_domains': [],
+            'has_domain_expertise': False
+        })
+    return matches
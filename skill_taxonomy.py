@@ -0,0 +1,91 @@
+# Canonical Skill Taxonomy
+# This file maps the skill columns of the survey CSV onto canonical skills: repeated
+# "(Skill N)" columns, spelling variants and misspellings collapse into one skill at
+# ingest, so the skill matrix has one column per real skill
+
+import hashlib
+import re
+
+# Misspelled or variant skill names and the canonical skill they stand for. Keys are
+# matched after normalisation (case, spacing, dashes and "&"/"and"), so only genuine
+# spelling differences need an entry here.
+SKILL_ALIASES = {
+    "Aquisitions": "Acquisitions",
+    "Bankrupcty and Insolvency (Debtor/Creditor)": "Bankruptcy and Insolvency (Debtor/Creditor)",
+    "Employee side Employment Issues": "Employee Side Employment Issues",
+}
+
+# Survey columns carry the skill name followed by the repeat number
+SKILL_COLUMN_PATTERN = re.compile(r'(.*) \(Skill \d+\)')
+
+# Function to normalise a skill name into its matching key
+def skill_key(name):
+    """
+    Returns the key two spellings of the same skill share: lowercase, single spaces,
+    one dash style and "&" read as "and"
+
+    Args:
+        name (str): Skill name
+
+    Returns:
+        str: Normalised key
+    """
+    key = name.lower().replace("&", " and ")
+    key = re.sub(r"\s*[-–—]\s*", " - ", key)
+    return " ".join(key.split())
+
+# Alias lookup keyed on normalised names
+_ALIAS_KEYS = {skill_key(alias): canonical for alias, canonical in SKILL_ALIASES.items()}
+
+# Function to resolve a skill name to its canonical name
+def canonical_skill(name):
+    """
+    Returns the canonical name of a skill: the alias target when the name is a known
+    variant, otherwise the name with its spacing tidied
+
+    Args:
+        name (str): Skill name as written in the source
+
+    Returns:
+        str: Canonical skill name
+    """
+    return _ALIAS_KEYS.get(skill_key(name), " ".join(name.split()))
+
+# Function to group the survey skill columns by canonical skill
+def group_skill_columns(columns):
+    """
+    Collapses survey columns into canonical skills. Columns whose names normalise to
+    the same key are one skill; the first spelling seen names it unless an alias
+    gives the canonical name.
+
+    Args:
+        columns (iterable): CSV column names
+
+    Returns:
+        dict: Canonical skill name -> list of source columns, in first-seen order
+    """
+    skill_map = {}
+    names = {}
+    for column in columns:
+        match = SKILL_COLUMN_PATTERN.match(column)
+        if not match:
+            continue
+        name = canonical_skill(match.group(1))
+        # Variants that differ only in case or spacing join the first spelling seen
+        name = names.setdefault(skill_key(name), name)
+        skill_map.setdefault(name, []).append(column)
+    return skill_map
+
+# Function to fingerprint the taxonomy rules
+def taxonomy_fingerprint():
+    """
+    Returns a short digest of the alias map, so rosters built under different
+    taxonomy rules get different versions
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha1()
+    for alias, canonical in sorted(SKILL_ALIASES.items()):
+        digest.update(f"{alias}\x00{canonical};".encode())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,231 @@
+# Typo-Tolerant Term Index
+# This file builds a character-trigram index over the words of the skill names,
+# domain names and domain terms, and uses it to correct misspelled query words
+# before the query is scored
+
+import os
+import re
+from collections import Counter
+
+from legal_domains import LEGAL_DOMAINS
+from roster_version import cached_per_roster_version
+
+# Words shorter than this are never corrected (too many near neighbours)
+MIN_CORRECTION_LENGTH = 5
+
+# Word length from which a substituted or extra letter counts as a typo. Shorter real
+# words often differ by one letter (hearing/heating, lease/leave), so below this only
+# dropped, doubled or swapped letters are corrected.
+SUBSTITUTION_LENGTH = 9
+
+# Word length from which two edits are tolerated instead of one
+TWO_EDIT_LENGTH = 13
+
+# Word endings that turn one word into another rather than marking a typo
+INFLECTION_SUFFIXES = {
+    "", "s", "es", "ies", "d", "ed", "ing", "e", "y", "er", "ers", "or", "ors", "ory",
+    "al", "ion", "ions", "ive", "ure", "ures", "ment", "ments", "ly"
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function to list the padded trigrams of a word
+def word_trigrams(word):
+    """
+    Returns the character trigrams of a word padded with two leading and one
+    trailing space, so short words and word starts get trigrams of their own
+
+    Args:
+        word (str): Lowercase word
+
+    Returns:
+        set: Trigrams of the word
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Function to compute a bounded edit distance
+def edit_distance(a, b, limit, substitution_cost=1):
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    adjacent transpositions), giving up early once it must exceed the limit
+
+    Args:
+        a (str): First word
+        b (str): Second word
+        limit (int): Largest distance of interest
+        substitution_cost (int): Cost of replacing one letter
+
+    Returns:
+        int: The distance, or limit + 1 when it is larger than the limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else substitution_cost
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1]
+
+# Function to choose the edit bound for a word
+def max_edits(word):
+    if len(word) < MIN_CORRECTION_LENGTH:
+        return 0
+    return 2 if len(word) >= TWO_EDIT_LENGTH else 1
+
+# Function to tell inflected forms of one stem apart from typos
+def is_inflection_variant(a, b):
+    """
+    True when two words share a stem and only differ by inflection endings
+    (structures and structured, directory and directors), which are different
+    words rather than typos
+    """
+    common = len(os.path.commonprefix([a, b]))
+    return any(
+        a[stem:] in INFLECTION_SUFFIXES and b[stem:] in INFLECTION_SUFFIXES
+        for stem in range(max(0, common - 2), common + 1)
+    )
+
+# Function to check whether a word only has one letter typed twice
+def is_doubled_letter(token, word):
+    return len(token) == len(word) + 1 and any(
+        token[i] == token[i - 1] and token[:i] + token[i + 1:] == word for i in range(1, len(token))
+    )
+
+# Class holding the trigram index over the matching vocabulary
+class TermIndex:
+    """
+    Trigram index over the words the matchers compare queries against
+    """
+
+    def __init__(self, phrases):
+        """
+        Builds the index
+
+        Args:
+            phrases (iterable): Skill names, domain names and domain terms
+        """
+        frequencies = Counter()
+        for phrase in phrases:
+            frequencies.update(WORD_PATTERN.findall(phrase.lower()))
+
+        self.words = sorted(frequencies)
+        self.frequencies = frequencies
+        self.word_set = set(self.words)
+        # Substring lookups use one joined string, matching the matchers' "in" tests
+        self._joined_words = "\x00".join(self.words)
+
+        self.postings = {}
+        for word_id, word in enumerate(self.words):
+            for trigram in word_trigrams(word):
+                self.postings.setdefault(trigram, []).append(word_id)
+
+    def nearest(self, token, limit=None):
+        """
+        Finds the vocabulary words closest to a token within the edit bound
+
+        Args:
+            token (str): Lowercase query word
+            limit (int): Edit bound (defaults to max_edits(token))
+
+        Returns:
+            list: (word, distance) pairs, closest and most frequent first
+        """
+        limit = max_edits(token) if limit is None else limit
+        if limit == 0:
+            return []
+
+        substitution_cost = 1 if len(token) >= SUBSTITUTION_LENGTH else limit + 1
+        trigrams = word_trigrams(token)
+        # Every edit changes at most four trigrams (three, or four for a swap)
+        required = max(1, len(trigrams) - 4 * limit)
+
+        shared = Counter()
+        for trigram in trigrams:
+            shared.update(self.postings.get(trigram, ()))
+
+        matches = []
+        for word_id, count in shared.items():
+            if count < required:
+                continue
+            word = self.words[word_id]
+            distance = edit_distance(token, word, limit, substitution_cost)
+            if distance <= limit:
+                matches.append((word, distance))
+
+        return sorted(matches, key=lambda match: (match[1], -self.frequencies[match[0]], match[0]))
+
+    def correct_token(self, token):
+        """
+        Returns the correction for a query word, or None when it needs none. Words that
+        already occur inside a vocabulary word, or extend one by a short suffix, are left
+        alone, and corrections must keep the first letter and may not merely change an
+        inflection ending.
+        """
+        if token in self.word_set or token in self._joined_words:
+            return None
+        # Inflections of a vocabulary word (plurals, -ed, -ing) already match it
+        if any(token[:end] in self.word_set for end in range(max(1, len(token) - 3), len(token))):
+            return None
+        for word, _ in self.nearest(token):
+            if word[0] != token[0] or is_inflection_variant(token, word):
+                continue
+            # In shorter words a stray extra letter usually makes another real word
+            # (marking/making); only a doubled letter is taken as a typo
+            if len(token) < SUBSTITUTION_LENGTH and len(token) > len(word) and not is_doubled_letter(token, word):
+                continue
+            return word
+        return None
+
+    def correct_query(self, query):
+        """
+        Replaces misspelled words of a query with their nearest vocabulary words
+
+        Args:
+            query (str): The search query
+
+        Returns:
+            tuple: (corrected query, {original word: correction})
+        """
+        corrections = {}
+
+        def replace(match):
+            token = match.group(0)
+            correction = self.correct_token(token.lower())
+            if correction is None:
+                return token
+            corrections[token] = correction
+            return correction
+
+        corrected = re.sub(r"[A-Za-z0-9]+", replace, query)
+        return corrected, corrections
+
+# Function to build the term index for a roster
+def build_term_index(unique_skills):
+    """
+    Builds the trigram index over the skill vocabulary and the legal domains
+
+    Args:
+        unique_skills (list): Skill names of the roster
+
+    Returns:
+        TermIndex: The index
+    """
+    phrases = list(unique_skills)
+    for domain_name, domain_terms in LEGAL_DOMAINS.items():
+        phrases.append(domain_name)
+        phrases.extend(domain_terms)
+    return TermIndex(phrases)
+
+# Function to get the cached term index for the current roster version
+get_term_index = cached_per_roster_version("term_index", lambda data: build_term_index(data['unique_skills']))
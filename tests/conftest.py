@@ -0,0 +1,81 @@
+# Test Setup
+# The app modules live at the repository root and read the roster files by relative
+# path, so tests import from and run in the repository root
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Tests never publish to the developer's roster store (publishing removes other
+# versions, which could wipe a store in use). Set before any test module imports
+# roster_store, whose function defaults are bound at import.
+os.environ["ROSTER_STORE_DIR"] = ""
+
+@pytest.fixture(autouse=True)
+def repo_root_cwd(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+
+@pytest.fixture(autouse=True)
+def roster_store_disabled(monkeypatch):
+    # The app script reads roster_store.ROSTER_STORE_DIR on every run; an empty value
+    # keeps load_lawyer_data off the store. Store tests pass their own directory.
+    import roster_store
+
+    monkeypatch.setenv("ROSTER_STORE_DIR", "")
+    monkeypatch.setattr(roster_store, "ROSTER_STORE_DIR", "")
+
+@pytest.fixture(scope="session")
+def roster_data():
+    """
+    The roster as the matchers see it, built from the repository's survey and bio
+    exports: skills, facet index and active mask. Availability and demo fields,
+    which do not affect ranking, are left blank.
+    """
+    from facets import build_facet_index
+    from lawyer_profile import EMPTY_BIO, build_lawyer_profiles
+    from roster_ingest import csr_to_dense, process_bio_data, read_bio_chunks, read_skill_survey
+    from roster_status import build_active_mask
+    from roster_version import BIO_CSV, ROSTER_STATUS_FILE, SKILLS_CSV
+
+    survey = read_skill_survey(os.path.join(REPO_ROOT, SKILLS_CSV))
+    skill_csr = survey['skill_csr']
+
+    bios = process_bio_data(read_bio_chunks(os.path.join(REPO_ROOT, BIO_CSV)))['lawyers_bio']
+
+    lawyers = []
+    for row, (name, email) in enumerate(zip(survey['names'], survey['emails'])):
+        start, end = skill_csr['indptr'][row], skill_csr['indptr'][row + 1]
+        lawyers.append({
+            'name': name,
+            'email': email,
+            'skills': {
+                survey['unique_skills'][column]: float(value)
+                for column, value in zip(skill_csr['indices'][start:end], skill_csr['data'][start:end])
+            },
+            'availability': 'Status Unknown',
+            'days_available': None,
+            'hours_available': None,
+            'vacation': [],
+            'engagement_note': '',
+            'practice_area': '',
+            'billable_rate': '',
+            'last_client': '',
+            'bio': bios.get(name, EMPTY_BIO)
+        })
+    lawyers = build_lawyer_profiles(lawyers, survey['unique_skills'])
+
+    return {
+        'lawyers': lawyers,
+        'skill_map': survey['skill_map'],
+        'unique_skills': survey['unique_skills'],
+        'facet_index': build_facet_index(lawyers),
+        'skill_matrix': csr_to_dense(skill_csr),
+        'active_mask': build_active_mask(lawyers, os.path.join(REPO_ROOT, ROSTER_STATUS_FILE)),
+        'roster_version': "test-roster"
+    }
@@ -0,0 +1,122 @@
+# Batched Ranking Tests
+# The batched, integer-kernel ranking must return what the per-query matcher returns
+
+import threading
+
+import numpy as np
+import pytest
+
+from batch_ranking import WEIGHT_SCALE, build_domain_skill_weights, integer_domain_scores, rank_lawyers_batch
+from domain_batch import identify_query_domains_batch
+from legal_domains import identify_query_domains, match_lawyers_with_domain_expertise
+import sharded_scoring
+from sharded_scoring import ShardedScorer, close_sharded_scorer, rank_lawyers_sharded
+
+QUERIES = [
+    "Employment issues and workplace discrimination in Ontario",
+    "Privacy compliance and cross-border data transfers",
+    "Securities regulation and capital markets",
+    "Technology licensing and SaaS contracts",
+    "M&A for tech companies",
+    "M&A due diligence for tech acquisition",
+    "Healthcare compliance regulations in Canada",
+    "Privacy compliance for healthcare app",
+    "Intellectual property protection and licensing",
+    "IP licensing for SaaS company",
+    "Fintech regulatory compliance",
+    "Commercial lease agreement review",
+    "mining contracts",
+    "franchise law",
+    "blockchain governance",
+    "bankruptcy and insolvency of a supplier",
+    "tax planning for a cross-border reorganization",
+    # No legal domain: keyword fallback
+    "sweepstakes",
+    ""
+]
+
+def match_key(matches):
+    return [
+        (match['lawyer']['name'], match['matched_skills'], match.get('matched_domains'),
+         match['has_domain_expertise'])
+        for match in matches
+    ]
+
+def test_integer_kernel_equals_float_product(roster_data):
+    weights = build_domain_skill_weights(roster_data['unique_skills'])
+    rng = np.random.default_rng(0)
+    random_matrix = rng.integers(0, 256, size=(500, len(roster_data['unique_skills'])), dtype=np.uint8)
+
+    for skill_matrix in (np.asarray(roster_data['skill_matrix']), random_matrix):
+        integer_scores = integer_domain_scores(weights, skill_matrix)
+        float_scores = weights @ skill_matrix.T.astype(np.float64)
+        np.testing.assert_array_equal(integer_scores / WEIGHT_SCALE, float_scores)
+
+def test_batch_domains_match_per_query_domains():
+    assert identify_query_domains_batch(QUERIES) == [identify_query_domains(query) for query in QUERIES]
+
+@pytest.mark.parametrize("top_n", [5, 10, 50])
+@pytest.mark.parametrize("facet_filters", [None, {'jurisdiction': ['Ontario']}, {'languages': ['French']}])
+def test_batch_ranking_matches_per_query_ranking(roster_data, top_n, facet_filters):
+    batch = rank_lawyers_batch(roster_data, QUERIES, top_n, facet_filters)
+
+    for query, batch_matches in zip(QUERIES, batch):
+        expected = match_lawyers_with_domain_expertise(roster_data, query, top_n, facet_filters)
+        assert match_key(batch_matches) == match_key(expected), query
+        assert [match['score'] for match in batch_matches] == pytest.approx(
+            [match['score'] for match in expected], rel=1e-12, abs=1e-12
+        ), query
+
+def test_skill_points_read_back_as_floats(roster_data):
+    lawyer = next(lawyer for lawyer in roster_data['lawyers'] if len(lawyer['skills']))
+    skill, value = lawyer['skills'].top(1)[0]
+
+    assert lawyer['skills'].values_array.typecode == 'B'
+    assert isinstance(value, float) and lawyer['skills'][skill] == value
+
+@pytest.mark.parametrize("facet_filters", [None, {'jurisdiction': ['Ontario']}])
+def test_sharded_ranking_matches_batch_ranking(roster_data, facet_filters):
+    try:
+        sharded = rank_lawyers_sharded(roster_data, QUERIES, 10, facet_filters, workers=3)
+    finally:
+        close_sharded_scorer()
+    batch = rank_lawyers_batch(roster_data, QUERIES, 10, facet_filters)
+
+    for query, sharded_matches, batch_matches in zip(QUERIES, sharded, batch):
+        expected = match_lawyers_with_domain_expertise(roster_data, query, 10, facet_filters)
+        assert match_key(sharded_matches) == match_key(batch_matches) == match_key(expected), query
+        assert [match['score'] for match in sharded_matches] == [match['score'] for match in batch_matches], query
+
+def test_dead_worker_is_reported_instead_of_hanging(roster_data):
+    scorer = ShardedScorer(roster_data, workers=2)
+    outcome = []
+    try:
+        scorer._processes[0].kill()
+        scorer._processes[0].join()
+
+        def rank():
+            try:
+                scorer.rank(QUERIES[:2])
+            except RuntimeError as e:
+                outcome.append(e)
+        thread = threading.Thread(target=rank, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+
+        assert not thread.is_alive()
+        assert len(outcome) == 1 and "exited unexpectedly" in str(outcome[0])
+        assert scorer.closed
+    finally:
+        scorer.close()
+
+def test_shared_scorer_restarts_after_a_worker_dies(roster_data):
+    try:
+        expected = rank_lawyers_sharded(roster_data, QUERIES[:2], workers=2)
+        sharded_scoring._current_scorer._processes[1].kill()
+        sharded_scoring._current_scorer._processes[1].join()
+
+        with pytest.raises(RuntimeError):
+            rank_lawyers_sharded(roster_data, QUERIES[:2], workers=2)
+        assert match_key(rank_lawyers_sharded(roster_data, QUERIES[:2], workers=2)[0]) == match_key(expected[0])
+    finally:
+        close_sharded_scorer()
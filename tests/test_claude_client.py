@@ -0,0 +1,150 @@
+# Claude Client Tests
+# Runs the rationale requests against a local mock of the Messages API, which
+# records each request body and reports a cache read whenever the prompt prefix up
+# to the last cache breakpoint was seen before
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import claude_client
+from claude_client import MIN_CACHEABLE_PROMPT_TOKENS, PromptCacheStats, build_rationale_payload
+from prompt_builder import BIO_FIELD_LABELS, PROMPT_TOKEN_BUDGET, build_rationale_prompt_parts, estimate_tokens
+
+# Class serving a mock Messages API
+class MockMessagesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        self.server.bodies.append(body)
+
+        prefix = cached_prefix(body)
+        prefix_key = hashlib.sha1(json.dumps(prefix).encode()).hexdigest() if prefix else None
+        cached = prefix_key in self.server.prefixes
+        if prefix_key:
+            self.server.prefixes.add(prefix_key)
+        prefix_tokens = estimate_tokens(json.dumps(prefix)) if prefix else 0
+        usage = {
+            "input_tokens": 40,
+            "cache_read_input_tokens": prefix_tokens if cached else 0,
+            "cache_creation_input_tokens": 0 if cached else prefix_tokens
+        }
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+        events = [{"type": "message_start", "message": {"usage": usage}}]
+        # Text pieces become text deltas; bytes are sent as they are, as a garbled event
+        events += [
+            piece.decode() if isinstance(piece, bytes) else
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}}
+            for piece in self.server.response_pieces
+        ]
+        events += [{"type": "message_delta", "usage": {"output_tokens": 25}}, {"type": "message_stop"}]
+        for event in events:
+            data = event if isinstance(event, str) else json.dumps(event)
+            self.wfile.write(f"event: message\ndata: {data}\n\n".encode())
+        self.close_connection = True
+
+# Function to return the prompt blocks up to the last cache breakpoint of a request
+def cached_prefix(body):
+    blocks = list(body["system"]) + list(body["messages"][0]["content"])
+    marked = [position for position, block in enumerate(blocks) if "cache_control" in block]
+    return blocks[:marked[-1] + 1] if marked else None
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockMessagesHandler)
+    server.bodies = []
+    server.prefixes = set()
+    server.response_pieces = ['{"Jane Doe": "Handles ', 'privacy work."}']
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(claude_client, "MESSAGES_URL", f"http://127.0.0.1:{server.server_port}/v1/messages")
+    monkeypatch.setattr(claude_client, "PROMPT_CACHE_STATS", PromptCacheStats())
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+def prompt_parts(profile_tokens, request="Client's Legal Need: \"privacy\""):
+    return {
+        "instructions": "Explain each match.",
+        "profiles": "LAWYER 1: Jane Doe\n" + "- Privacy: 10 points\n" * (profile_tokens // 6),
+        "request": request
+    }
+
+def test_short_prefix_gets_no_cache_breakpoint():
+    payload = build_rationale_payload(prompt_parts(200))
+
+    assert not any("cache_control" in block for block in payload["system"])
+    assert not any("cache_control" in block for block in payload["messages"][0]["content"])
+
+def test_profiles_breakpoint_only_when_prefix_is_cacheable():
+    payload = build_rationale_payload(prompt_parts(MIN_CACHEABLE_PROMPT_TOKENS + 100))
+
+    assert not any("cache_control" in block for block in payload["system"])
+    profiles_block, request_block = payload["messages"][0]["content"]
+    assert profiles_block["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in request_block
+
+def test_default_budget_leaves_room_for_a_cacheable_prefix():
+    bio = {field: "Privacy and data protection counsel. " * 20 for field, _ in BIO_FIELD_LABELS}
+    matches = [{
+        'lawyer': {'name': f"Lawyer {i}", 'email': f"lawyer{i}@example.com", 'bio': bio, 'availability': "Available",
+                   'days_available': None, 'hours_available': None, 'engagement_note': ""},
+        'matched_skills': [{'skill': "Privacy", 'value': 10}]
+    } for i in range(5)]
+    parts = build_rationale_prompt_parts("privacy", matches, "budget-test", PROMPT_TOKEN_BUDGET)
+
+    prefix_tokens = sum(estimate_tokens(text) for text in (claude_client.SYSTEM_PROMPT, parts['instructions'], parts['profiles']))
+    assert MIN_CACHEABLE_PROMPT_TOKENS <= prefix_tokens <= PROMPT_TOKEN_BUDGET + estimate_tokens(claude_client.SYSTEM_PROMPT)
+    assert "cache_control" in build_rationale_payload(parts)["messages"][0]["content"][0]
+
+def test_repeated_profiles_are_read_from_cache(mock_api):
+    first = prompt_parts(MIN_CACHEABLE_PROMPT_TOKENS + 100, request="Client's Legal Need: \"privacy\"")
+    second = prompt_parts(MIN_CACHEABLE_PROMPT_TOKENS + 100, request="Client's Legal Need: \"data protection\"")
+
+    assert claude_client.fetch_rationales(first, "test-key") == {"Jane Doe": "Handles privacy work."}
+    assert claude_client.fetch_rationales(second, "test-key") == {"Jane Doe": "Handles privacy work."}
+
+    first_body, second_body = mock_api.bodies
+    assert first_body["stream"] is True
+    assert first_body["model"] == claude_client.RATIONALE_MODEL
+    assert cached_prefix(first_body) == cached_prefix(second_body)
+
+    stats = claude_client.PROMPT_CACHE_STATS.snapshot()
+    assert stats["requests"] == 2
+    assert stats["misses"] == 1 and stats["hits"] == 1
+    assert stats["cache_creation_input_tokens"] == stats["cache_read_input_tokens"] > 0
+    assert stats["output_tokens"] == 50
+
+def test_short_prompts_are_never_cache_hits(mock_api):
+    prompt = prompt_parts(200)
+
+    claude_client.fetch_rationales(prompt, "test-key")
+    claude_client.fetch_rationales(prompt, "test-key")
+
+    stats = claude_client.PROMPT_CACHE_STATS.snapshot()
+    assert stats["hits"] == 0 and stats["cache_read_input_tokens"] == 0
+
+def test_malformed_event_keeps_streamed_rationales(mock_api):
+    mock_api.response_pieces = [
+        '{"Jane Doe": "Handles privacy work.", ',
+        b'{"type": "content_block_delta", "delta": {"type": "text_d',
+        '"John Roe": "Handles leases."}'
+    ]
+
+    rationales = claude_client.fetch_rationales(prompt_parts(200), "test-key")
+
+    assert rationales == {"Jane Doe": "Handles privacy work.", "John Roe": "Handles leases."}
+    assert claude_client.PROMPT_CACHE_STATS.snapshot()["requests"] == 1
@@ -0,0 +1,29 @@
+# Facet Filter Tests
+
+from streamlit.testing.v1 import AppTest
+
+from facets import normalise_facet_key
+
+def sidebar_multiselects(app):
+    return {widget.label: widget for widget in app.sidebar.multiselect}
+
+def test_ampersand_and_spelled_out_and_share_a_key():
+    assert normalise_facet_key("Oil & Gas") == normalise_facet_key("Oil and Gas")
+    assert normalise_facet_key("E-commerce") == normalise_facet_key("Ecommerce")
+
+def test_selections_on_two_facets_both_stick():
+    app = AppTest.from_file("main.py", default_timeout=120).run()
+    assert not app.exception
+
+    sidebar_multiselects(app)["Jurisdiction"].select("Ontario").run()
+    sidebar_multiselects(app)["Languages"].select("English").run()
+
+    widgets = sidebar_multiselects(app)
+    assert widgets["Jurisdiction"].value == ["Ontario"]
+    assert widgets["Languages"].value == ["English"]
+
+    # Another rerun keeps both
+    app.run()
+    widgets = sidebar_multiselects(app)
+    assert widgets["Jurisdiction"].value == ["Ontario"]
+    assert widgets["Languages"].value == ["English"]
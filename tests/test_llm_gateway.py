@@ -0,0 +1,97 @@
+# LLM Gateway Tests
+# The gateway is exercised with a fake upstream fetch, so no request leaves the process
+
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from llm_gateway import RationaleGateway
+
+class FakeUpstream:
+    """
+    Stand-in for fetch_rationales that records its calls and can be held open
+    """
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, prompt, api_key):
+        with self.lock:
+            self.starts.append(time.monotonic())
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self.release.wait(10)
+            time.sleep(self.duration)
+            return {"Jane Doe": f"Answer to {prompt}"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+def test_identical_concurrent_requests_make_one_upstream_call():
+    upstream = FakeUpstream()
+    upstream.release.clear()
+    gateway = RationaleGateway(max_concurrency=4, requests_per_minute=6000, fetch=upstream)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(gateway.fetch, "same prompt", "key") for _ in range(8)]
+        wait_for(lambda: gateway.stats()["coalesced_requests"] == 7)
+        upstream.release.set()
+        results = [future.result(5) for future in futures]
+
+    assert results == [{"Jane Doe": "Answer to same prompt"}] * 8
+    assert len(upstream.starts) == 1
+    assert gateway.stats() == {"upstream_calls": 1, "coalesced_requests": 7, "in_flight": 0}
+
+def test_concurrency_limit_holds():
+    upstream = FakeUpstream(duration=0.05)
+    gateway = RationaleGateway(max_concurrency=2, requests_per_minute=60000, fetch=upstream)
+
+    futures = [gateway.submit(f"prompt {i}", "key") for i in range(6)]
+    for future in futures:
+        future.result(5)
+
+    assert len(upstream.starts) == 6
+    assert upstream.max_active == 2
+
+def test_rate_limit_spaces_upstream_calls():
+    upstream = FakeUpstream()
+    gateway = RationaleGateway(max_concurrency=1, requests_per_minute=600, fetch=upstream)
+
+    futures = [gateway.submit(f"prompt {i}", "key") for i in range(4)]
+    for future in futures:
+        future.result(5)
+
+    # One call is allowed at once, then one every 0.1 s
+    gaps = [later - earlier for earlier, later in zip(upstream.starts, upstream.starts[1:])]
+    assert len(gaps) == 3
+    assert min(gaps) >= 0.09
+
+def test_caller_timeout_leaves_shared_request_running():
+    upstream = FakeUpstream()
+    upstream.release.clear()
+    gateway = RationaleGateway(max_concurrency=2, requests_per_minute=6000, fetch=upstream)
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        gateway.fetch("slow prompt", "key", timeout=0.05)
+
+    waiter = gateway.submit("slow prompt", "key")
+    upstream.release.set()
+
+    assert waiter.result(5) == {"Jane Doe": "Answer to slow prompt"}
+    assert gateway.stats()["upstream_calls"] == 1
+    assert gateway.stats()["coalesced_requests"] == 1
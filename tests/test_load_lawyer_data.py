@@ -0,0 +1,25 @@
+# Roster Loading Tests
+
+from streamlit.testing.v1 import AppTest
+
+import roster_ingest
+import roster_version
+
+def test_failed_load_is_reported_and_retried(monkeypatch):
+    monkeypatch.setattr(roster_version, "compute_roster_version", lambda: "load-failure-test")
+
+    read_skill_survey = roster_ingest.read_skill_survey
+    def unreadable_survey(path, *args, **kwargs):
+        raise OSError(f"cannot read {path}")
+    monkeypatch.setattr(roster_ingest, "read_skill_survey", unreadable_survey)
+
+    app = AppTest.from_file("main.py", default_timeout=120).run()
+    assert not app.exception
+    assert any("Error loading data: cannot read" in error.value for error in app.error)
+
+    # The failure was not cached: once the survey is readable the same version loads
+    monkeypatch.setattr(roster_ingest, "read_skill_survey", read_skill_survey)
+    app.run()
+    assert not app.exception
+    assert not any("Error loading data" in error.value for error in app.error)
+    assert app.sidebar.multiselect
@@ -0,0 +1,131 @@
+# Offline Rationale Tests
+# Template output, and the RATIONALE_MODE and RATIONALE_TIMEOUT_SECONDS switches run
+# through the app with a fake upstream behind the LLM gateway
+
+import threading
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import llm_gateway
+import offline_rationale
+import result_cache
+from offline_rationale import generate_offline_rationale, generate_offline_rationales
+
+QUERY = "Employment issues and workplace discrimination in Ontario"
+
+def make_match(level="Associate", availability="Available Now", domains=("Employment",), has_domain_expertise=True):
+    return {
+        'lawyer': {
+            'name': "Jane Doe ",
+            'availability': availability,
+            'bio': {
+                'level': level,
+                'call': "Ontario  2015",
+                'jurisdiction': "Ontario; Quebec",
+                'previous_in_house': "Acme Corp, Beta Inc, Gamma LLC",
+                'industry_experience': ""
+            }
+        },
+        'matched_skills': [{'skill': "Employer Side Employment Issues", 'value': 12.0},
+                           {'skill': "Human Rights", 'value': 7.5}],
+        'matched_domains': list(domains),
+        'has_domain_expertise': has_domain_expertise
+    }
+
+def test_rationale_template():
+    assert generate_offline_rationale(make_match()) == (
+        "Jane Doe allocated self-assessed points to Employer Side Employment Issues (12 points) and "
+        "Human Rights (7.5 points), which relate to the Employment expertise identified in this request. "
+        "They are an Associate, called to the bar in Ontario 2015 with practice in Ontario and Quebec. "
+        "In-house experience includes Acme Corp and Beta Inc. "
+        "Jane Doe is currently available to take on new work."
+    )
+
+@pytest.mark.parametrize("level, phrase", [
+    ("Senior Counsel", "They are a Senior Counsel,"),
+    ("Articling Student", "They are an Articling Student,"),
+    ("  ", "They are called to the bar")
+])
+def test_article_follows_the_title(level, phrase):
+    assert phrase in generate_offline_rationale(make_match(level=level))
+
+def test_keyword_match_without_domain_expertise():
+    match = make_match(domains=(), availability="Status Unknown")
+    rationale = generate_offline_rationale(match)
+
+    assert "matched on the keywords of this request rather than a specific legal domain" in rationale
+    assert "fit should be confirmed" not in rationale
+    assert not rationale.endswith("new work.")
+
+    match = make_match(has_domain_expertise=False)
+    assert "so the fit should be confirmed" in generate_offline_rationale(match)
+
+def test_rationales_are_keyed_by_lawyer_name():
+    match = make_match()
+    assert generate_offline_rationales([match]) == {"Jane Doe ": generate_offline_rationale(match)}
+
+class FakeUpstream:
+    def __init__(self, answer=None):
+        self.answer = answer
+        self.calls = 0
+        self.release = threading.Event()
+        if answer is not None:
+            self.release.set()
+
+    def __call__(self, prompt, api_key):
+        self.calls += 1
+        self.release.wait(10)
+        return self.answer or {}
+
+@pytest.fixture
+def search_app(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(result_cache, "SEARCH_RESULT_CACHE", result_cache.ResultCache())
+
+    def run(upstream):
+        monkeypatch.setattr(llm_gateway, "RATIONALE_GATEWAY", llm_gateway.RationaleGateway(fetch=upstream))
+        app = AppTest.from_file("main.py", default_timeout=120).run()
+        app.session_state['query'] = QUERY
+        app.session_state['search_pressed'] = True
+        app.run()
+        assert not app.exception
+        return app, "".join(element.value for element in app.markdown if 'class="lawyer-card"' in element.value)
+
+    return run
+
+def test_offline_mode_never_calls_the_llm(search_app, monkeypatch):
+    monkeypatch.setattr(offline_rationale, "RATIONALE_MODE", "offline")
+    upstream = FakeUpstream(answer={})
+
+    _, cards = search_app(upstream)
+
+    assert upstream.calls == 0
+    assert "allocated self-assessed points" in cards
+
+def test_llm_answer_replaces_offline_rationales(search_app, monkeypatch):
+    monkeypatch.setattr(offline_rationale, "RATIONALE_MODE", "llm")
+    upstream = FakeUpstream(answer={})
+    app, _ = search_app(upstream)
+    names = list(app.session_state['search_results']['reasoning'])
+
+    upstream = FakeUpstream(answer={name: "Answer from the LLM." for name in names})
+    monkeypatch.setattr(result_cache, "SEARCH_RESULT_CACHE", result_cache.ResultCache())
+    _, cards = search_app(upstream)
+
+    assert upstream.calls == 1
+    assert "Answer from the LLM." in cards and "allocated self-assessed points" not in cards
+
+def test_llm_timeout_keeps_offline_rationales(search_app, monkeypatch):
+    monkeypatch.setattr(offline_rationale, "RATIONALE_MODE", "llm")
+    monkeypatch.setattr(offline_rationale, "RATIONALE_TIMEOUT_SECONDS", 0.2)
+    upstream = FakeUpstream()
+
+    try:
+        app, cards = search_app(upstream)
+    finally:
+        upstream.release.set()
+
+    assert upstream.calls == 1
+    assert any("taking longer than expected" in warning.value for warning in app.warning)
+    assert "allocated self-assessed points" in cards
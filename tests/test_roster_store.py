@@ -0,0 +1,82 @@
+# Roster Store Tests
+
+import os
+
+import numpy as np
+import pytest
+
+import roster_store
+from roster_ingest import process_bio_data, read_bio_chunks
+from roster_store import CURRENT_POINTER, attach_roster, current_roster_version, publish_roster
+from roster_version import BIO_CSV
+
+def with_version(data, version):
+    return dict(data, roster_version=version)
+
+def test_published_roster_reads_back(roster_data, tmp_path):
+    publish_roster(roster_data, store_dir=tmp_path)
+    attached = attach_roster(store_dir=tmp_path)
+
+    assert current_roster_version(tmp_path) == "test-roster"
+    assert attached['roster_version'] == "test-roster"
+    assert attached['unique_skills'] == roster_data['unique_skills']
+    assert attached['skill_map'] == roster_data['skill_map']
+    np.testing.assert_array_equal(attached['skill_matrix'], roster_data['skill_matrix'])
+    np.testing.assert_array_equal(attached['active_mask'], roster_data['active_mask'])
+
+    assert len(attached['lawyers']) == len(roster_data['lawyers'])
+    for read, written in zip(attached['lawyers'], roster_data['lawyers']):
+        assert read['name'] == written['name']
+        assert read['email'] == written['email']
+        assert dict(read['skills'].items()) == dict(written['skills'].items())
+
+    for facet, entry in roster_data['facet_index'].items():
+        if facet == "size":
+            continue
+        assert attached['facet_index'][facet]['counts'] == entry['counts']
+        for key, bitmap in entry['bitmaps'].items():
+            np.testing.assert_array_equal(attached['facet_index'][facet]['bitmaps'][key], bitmap)
+
+def test_lazy_bios_match_processed_bios(roster_data, tmp_path):
+    publish_roster(roster_data, store_dir=tmp_path)
+    attached = attach_roster(store_dir=tmp_path)
+    bios = process_bio_data(read_bio_chunks(BIO_CSV))['lawyers_bio']
+
+    matched = 0
+    for lawyer in attached['lawyers']:
+        if lawyer['name'] in bios:
+            assert dict(lawyer['bio']) == bios[lawyer['name']]
+            matched += 1
+    assert matched > 0
+
+def test_failed_publish_keeps_previous_version(roster_data, tmp_path, monkeypatch):
+    publish_roster(roster_data, store_dir=tmp_path)
+
+    write_roster = roster_store._write_roster
+    def torn_write(data, directory):
+        write_roster(data, directory)
+        os.remove(os.path.join(directory, "manifest.json"))
+        raise OSError("disk full")
+    monkeypatch.setattr(roster_store, "_write_roster", torn_write)
+
+    with pytest.raises(OSError):
+        publish_roster(with_version(roster_data, "next-roster"), store_dir=tmp_path)
+
+    assert current_roster_version(tmp_path) == "test-roster"
+    assert attach_roster(store_dir=tmp_path)['roster_version'] == "test-roster"
+    assert attach_roster("next-roster", store_dir=tmp_path) is None
+    assert sorted(os.listdir(tmp_path)) == [CURRENT_POINTER, "test-roster"]
+
+def test_directory_without_manifest_is_not_attached(roster_data, tmp_path):
+    publish_roster(roster_data, store_dir=tmp_path)
+    os.remove(os.path.join(tmp_path, "test-roster", "manifest.json"))
+
+    assert attach_roster(store_dir=tmp_path) is None
+
+def test_publishing_drops_older_versions(roster_data, tmp_path):
+    publish_roster(roster_data, store_dir=tmp_path)
+    publish_roster(with_version(roster_data, "next-roster"), store_dir=tmp_path)
+
+    assert current_roster_version(tmp_path) == "next-roster"
+    assert sorted(os.listdir(tmp_path)) == [CURRENT_POINTER, "next-roster"]
+    assert attach_roster("test-roster", store_dir=tmp_path) is None
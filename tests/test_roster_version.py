@@ -0,0 +1,38 @@
+# Roster Version Tests
+
+import os
+
+import pytest
+
+from roster_version import BIO_CSV, BIO_PARQUET, SKILLS_CSV, SKILLS_PARQUET, compute_roster_version, roster_sources
+
+def write(path, text, mtime):
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns=(mtime, mtime))
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write(SKILLS_CSV, "skills", 1_000_000_000)
+    write(BIO_CSV, "bio", 1_000_000_000)
+    return tmp_path
+
+def test_csvs_are_used_until_converted(sources):
+    assert roster_sources() == (SKILLS_CSV, BIO_CSV)
+
+    write(SKILLS_PARQUET, "skills", 2_000_000_000)
+    assert roster_sources() == (SKILLS_CSV, BIO_CSV)
+
+    write(BIO_PARQUET, "bio", 2_000_000_000)
+    assert roster_sources() == (SKILLS_PARQUET, BIO_PARQUET)
+
+def test_newer_csv_export_wins_over_old_parquet(sources):
+    write(SKILLS_PARQUET, "skills", 2_000_000_000)
+    write(BIO_PARQUET, "bio", 2_000_000_000)
+    version = compute_roster_version()
+
+    write(BIO_CSV, "updated bio", 3_000_000_000)
+
+    assert roster_sources() == (SKILLS_CSV, BIO_CSV)
+    assert compute_roster_version() != version
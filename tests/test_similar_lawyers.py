@@ -0,0 +1,66 @@
+# Similar Lawyers Tests
+# The stored neighbour lists must give what a brute-force cosine search gives
+
+import numpy as np
+import pytest
+
+import similar_lawyers
+from similar_lawyers import find_similar_lawyers, is_unavailable
+
+AVAILABILITY = ["Available", "Limited Availability", "On Vacation", "Not Available", "Status Unknown"]
+
+def synthetic_roster(version):
+    rng = np.random.default_rng(7)
+    skill_matrix = rng.random((80, 15)) * 10
+    skill_matrix[rng.random(skill_matrix.shape) < 0.6] = 0
+    skill_matrix[3] = 0
+    return {
+        'lawyers': [
+            {'name': f"Lawyer {row}", 'email': f"lawyer{row}@example.com",
+             'availability': AVAILABILITY[row % len(AVAILABILITY)]}
+            for row in range(len(skill_matrix))
+        ],
+        'skill_matrix': skill_matrix,
+        'active_mask': rng.random(len(skill_matrix)) > 0.15,
+        'roster_version': version
+    }
+
+def brute_force(data, row, k, available_only):
+    vectors = np.asarray(data['skill_matrix'], dtype=np.float64)
+    scored = []
+    for other, lawyer in enumerate(data['lawyers']):
+        if other == row or not data['active_mask'][other]:
+            continue
+        if available_only and is_unavailable(lawyer['availability']):
+            continue
+        norms = np.linalg.norm(vectors[row]) * np.linalg.norm(vectors[other])
+        similarity = vectors[row] @ vectors[other] / norms if norms else 0.0
+        if similarity > 0:
+            scored.append((-similarity, other))
+    return [(other, -negative) for negative, other in sorted(scored)[:k]]
+
+@pytest.mark.parametrize("stored", [20, 3])
+@pytest.mark.parametrize("available_only", [True, False])
+def test_neighbours_match_brute_force(monkeypatch, stored, available_only):
+    # With only 3 stored neighbours most requests fall back to the on-demand product
+    monkeypatch.setattr(similar_lawyers, "SIMILAR_LAWYERS_STORED", stored)
+    data = synthetic_roster(f"similar-{stored}-{available_only}")
+
+    for row in range(len(data['lawyers'])):
+        found = find_similar_lawyers(data, row, k=5, available_only=available_only)
+        expected = brute_force(data, row, 5, available_only)
+        assert [other for other, _ in found] == [other for other, _ in expected], row
+        assert [similarity for _, similarity in found] == pytest.approx(
+            [similarity for _, similarity in expected], abs=1e-5
+        ), row
+
+def test_unavailable_and_inactive_lawyers_are_left_out():
+    data = synthetic_roster("similar-filter")
+
+    for row in range(len(data['lawyers'])):
+        for other, _ in find_similar_lawyers(data, row, k=10):
+            assert data['active_mask'][other]
+            assert data['lawyers'][other]['availability'] in ("Available", "Status Unknown")
+
+def test_lawyer_without_skills_has_no_neighbours():
+    assert find_similar_lawyers(synthetic_roster("similar-empty"), 3) == []
@@ -0,0 +1,45 @@
+# Skill Taxonomy Tests
+
+import pandas as pd
+
+from roster_ingest import csr_to_dense, read_skill_survey
+from roster_version import SKILLS_CSV
+from skill_taxonomy import SKILL_COLUMN_PATTERN, canonical_skill, group_skill_columns
+
+def test_survey_columns_merge_into_canonical_skills():
+    columns = pd.read_csv(SKILLS_CSV, nrows=0).columns
+    skill_map = group_skill_columns(columns)
+    source_names = {match.group(1) for match in map(SKILL_COLUMN_PATTERN.match, columns) if match}
+
+    assert (len(source_names), len(skill_map)) == (169, 168)
+    # The misspelled column joins the correctly spelled skill
+    assert skill_map['Acquisitions'] == ['Acquisitions (Skill 1)', 'Aquisitions (Skill 6)']
+    # Misspellings without a correctly spelled column are renamed
+    assert skill_map['Bankruptcy and Insolvency (Debtor/Creditor)'] == ['Bankrupcty and Insolvency (Debtor/Creditor) (Skill 11)']
+    assert skill_map['Employee Side Employment Issues'] == ['Employee side Employment Issues (Skill 53)']
+    assert not {'Aquisitions', 'Bankrupcty and Insolvency (Debtor/Creditor)', 'Employee side Employment Issues'} & set(skill_map)
+
+def test_spacing_and_case_variants_share_a_skill():
+    assert canonical_skill("  aquisitions ") == "Acquisitions"
+    assert group_skill_columns(["Tax  Law (Skill 1)", "tax law (Skill 2)", "Mergers & Acquisitions (Skill 3)",
+                                "Mergers and Acquisitions (Skill 4)"]) == {
+        "Tax Law": ["Tax  Law (Skill 1)", "tax law (Skill 2)"],
+        "Mergers & Acquisitions": ["Mergers & Acquisitions (Skill 3)", "Mergers and Acquisitions (Skill 4)"]
+    }
+
+def test_merged_columns_keep_the_highest_points(tmp_path):
+    path = tmp_path / "survey.csv"
+    pd.DataFrame({
+        'Submitter Name': ["Both", "First only", "Second only", "Neither"],
+        'Submitter Email': ["a@example.com", "b@example.com", "c@example.com", "d@example.com"],
+        'Acquisitions (Skill 1)': [3, 4, None, None],
+        'Aquisitions (Skill 6)': [5, None, 2, None],
+        'Tax (Skill 2)': [1, None, None, 6]
+    }).to_csv(path, index=False)
+
+    survey = read_skill_survey(str(path))
+    matrix = csr_to_dense(survey['skill_csr'])
+
+    assert survey['unique_skills'] == ['Acquisitions', 'Tax']
+    # Points are not added up: a lawyer who filled in both spellings keeps the larger value
+    assert matrix.tolist() == [[5, 1], [4, 0], [2, 0], [0, 6]]
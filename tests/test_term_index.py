@@ -0,0 +1,29 @@
+# Term Index Tests
+
+import pytest
+
+from term_index import build_term_index
+
+@pytest.fixture(scope="module")
+def term_index(roster_data):
+    return build_term_index(roster_data['unique_skills'])
+
+@pytest.mark.parametrize("typo, correction", [
+    ("aquisitions", "acquisitions"),
+    ("employmnet", "employment"),
+    ("licencing", "licensing"),
+    ("bankrupcty", "bankruptcy")
+])
+def test_misspelled_words_are_corrected(term_index, typo, correction):
+    assert term_index.correct_token(typo) == correction
+
+def test_query_keeps_correct_words_and_reports_corrections(term_index):
+    corrected, corrections = term_index.correct_query("Aquisitions and employment law")
+
+    assert corrected == "acquisitions and employment law"
+    assert corrections == {"Aquisitions": "acquisitions"}
+
+def test_words_outside_the_vocabulary_are_left_alone(term_index):
+    # PIPEDA is not a skill, domain or domain term, so a misspelling of it has no target
+    assert "pipeda" not in term_index.word_set
+    assert term_index.correct_token("pipida") is None
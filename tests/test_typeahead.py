@@ -0,0 +1,46 @@
+# Typeahead Tests
+# The per-node top completions must equal a brute-force ranking of every suggestion
+# reachable from the typed prefix
+
+import pytest
+
+from typeahead import SUGGESTION_KINDS, TypeaheadIndex, build_typeahead_index, normalise_text
+
+PREFIXES = ["p", "priv", "data p", "emp", "m", "mergers", "tax", "c", "co", "j", "zz", ""]
+
+def brute_force(index, prefix, k):
+    prefix = normalise_text(prefix)
+
+    def reachable(suggestion):
+        words = normalise_text(suggestion["text"]).split(" ")
+        return any(" ".join(words[start:]).startswith(prefix) for start in range(len(words)))
+
+    ranked = sorted(
+        (suggestion for suggestion in index.suggestions if reachable(suggestion)),
+        key=lambda suggestion: (-suggestion["weight"], SUGGESTION_KINDS.index(suggestion["kind"]),
+                                len(suggestion["text"]), suggestion["text"].lower())
+    )
+    return [suggestion["text"] for suggestion in ranked[:k]]
+
+@pytest.mark.parametrize("k", [1, 5, 10])
+def test_roster_completions_match_brute_force(roster_data, k):
+    index = build_typeahead_index(roster_data)
+
+    for prefix in PREFIXES:
+        assert [suggestion["text"] for suggestion in index.complete(prefix, k)] == brute_force(index, prefix, k), prefix
+
+def test_small_node_lists_match_brute_force():
+    suggestions = [
+        ("Data Privacy", "skill", 7), ("Privacy", "domain", 7), ("privacy", "term", 9),
+        ("Private Equity", "skill", 3), ("Priority Claims", "term", 3), ("Employment", "domain", 12),
+        ("Employee Benefits", "skill", 4), ("Priya Patel", "lawyer", 1), ("Data Protection", "term", 7)
+    ]
+    index = TypeaheadIndex(suggestions, max_results=2)
+
+    for prefix in ["p", "pri", "priv", "data", "d", "e", "emp", "x"]:
+        assert [suggestion["text"] for suggestion in index.complete(prefix, 2)] == brute_force(index, prefix, 2), prefix
+
+def test_duplicate_texts_keep_the_heaviest_entry():
+    index = TypeaheadIndex([("Privacy", "domain", 7), ("privacy", "term", 9)])
+
+    assert index.complete("priv") == [{"text": "privacy", "kind": "term", "weight": 9.0}]
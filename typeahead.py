@@ -0,0 +1,176 @@
+# Typeahead Suggestions
+# This file builds a prefix trie over skill names, legal domains, domain terms and
+# lawyer names, weighted by how many lawyers each suggestion would reach, so
+# completions can be looked up while the query is typed
+
+import heapq
+import re
+
+import numpy as np
+
+from batch_ranking import get_ranking_index
+from domain_batch import DOMAIN_VOCABULARY
+from legal_domains import LEGAL_DOMAINS
+from roster_version import cached_per_roster_version
+
+# Largest number of completions kept per trie node
+TYPEAHEAD_MAX_RESULTS = 10
+
+# Suggestion kinds, most specific first; used to break weight ties and to keep one
+# entry when the same text is, for example, both a skill and a domain term
+SUGGESTION_KINDS = ("domain", "skill", "term", "lawyer")
+
+# Function to normalise text for prefix matching
+def normalise_text(text):
+    """
+    Lowercases text and collapses whitespace
+
+    Args:
+        text (str): Suggestion or typed prefix
+
+    Returns:
+        str: Normalised text
+    """
+    return " ".join(str(text).lower().split())
+
+# Class for one trie node
+class TrieNode:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # Ids of the suggestions whose key ends here
+        self.entries = []
+        # Best suggestion ids of the whole subtree, best first
+        self.top = []
+
+# Class holding the typeahead trie for one roster
+class TypeaheadIndex:
+    """
+    Prefix trie whose nodes store their best completions, so a lookup is a walk down
+    the typed prefix. Every suggestion is reachable from the start of each of its
+    words ("priv" finds "Data Privacy").
+    """
+
+    def __init__(self, suggestions, max_results=TYPEAHEAD_MAX_RESULTS):
+        """
+        Builds the trie
+
+        Args:
+            suggestions (iterable): (text, kind, weight) tuples
+            max_results (int): Completions kept per node
+        """
+        self.max_results = max_results
+
+        # One entry per normalised text: the highest weight wins, then the most specific kind
+        best = {}
+        for text, kind, weight in suggestions:
+            key = normalise_text(text)
+            if not key:
+                continue
+            entry = (float(weight), -SUGGESTION_KINDS.index(kind), text.strip(), kind)
+            if key not in best or entry[:2] > best[key][:2]:
+                best[key] = entry
+
+        self.suggestions = []
+        for key, (weight, _, text, kind) in best.items():
+            self.suggestions.append({"text": text, "kind": kind, "weight": weight})
+        # Rank order: weight, then kind, then shorter and alphabetical text
+        self._rank = {
+            suggestion_id: (-suggestion["weight"], SUGGESTION_KINDS.index(suggestion["kind"]),
+                            len(suggestion["text"]), suggestion["text"].lower())
+            for suggestion_id, suggestion in enumerate(self.suggestions)
+        }
+
+        self.root = TrieNode()
+        for suggestion_id, suggestion in enumerate(self.suggestions):
+            words = normalise_text(suggestion["text"]).split(" ")
+            for start in range(len(words)):
+                node = self.root
+                for char in " ".join(words[start:]):
+                    node = node.children.setdefault(char, TrieNode())
+                node.entries.append(suggestion_id)
+
+        self._collect_top(self.root)
+
+    def _collect_top(self, root):
+        # Iterative post-order walk (suggestion keys can be deeper than the recursion limit)
+        stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+
+            candidates = set(node.entries)
+            for child in node.children.values():
+                candidates.update(child.top)
+            node.top = heapq.nsmallest(self.max_results, candidates, key=self._rank.__getitem__)
+
+    def complete(self, prefix, k=5, kinds=None):
+        """
+        Returns the best completions of a typed prefix
+
+        Args:
+            prefix (str): Typed text
+            k (int): Number of completions (at most max_results)
+            kinds (iterable): Optional suggestion kinds to keep
+
+        Returns:
+            list: Suggestion dicts ({"text", "kind", "weight"}), best first
+        """
+        node = self.root
+        for char in normalise_text(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        results = []
+        for suggestion_id in node.top:
+            suggestion = self.suggestions[suggestion_id]
+            if kinds is None or suggestion["kind"] in kinds:
+                results.append(dict(suggestion))
+                if len(results) >= k:
+                    break
+        return results
+
+# Function to build the typeahead index for a roster
+def build_typeahead_index(data):
+    """
+    Builds the typeahead suggestions of a roster, weighted by the number of lawyers
+    (only active lawyers count) each one reaches
+
+    Args:
+        data (dict): The lawyer data structure, including 'skill_matrix'
+
+    Returns:
+        TypeaheadIndex: The index
+    """
+    ranking_index = get_ranking_index(data)
+    eligible = ranking_index['eligible']
+    skill_matrix = np.asarray(data['skill_matrix'])
+
+    suggestions = []
+
+    # Skills: lawyers reporting the skill
+    skill_counts = (skill_matrix[eligible] > 0).sum(axis=0)
+    for skill, count in zip(data['unique_skills'], skill_counts):
+        suggestions.append((skill, "skill", int(count)))
+
+    # Domains: lawyers with any skill in the domain; terms inherit their domain's reach
+    domain_counts = (ranking_index['domain_scores'][:, eligible] > 0).sum(axis=1)
+    for domain_name, count in zip(DOMAIN_VOCABULARY.domain_names, domain_counts):
+        suggestions.append((domain_name, "domain", int(count)))
+        for term in LEGAL_DOMAINS[domain_name]:
+            suggestions.append((term, "term", int(count)))
+
+    # Lawyers: normalised names, one lawyer each
+    for lawyer, is_eligible in zip(data['lawyers'], eligible):
+        if is_eligible:
+            suggestions.append((re.sub(r"\s+", " ", lawyer['name']).strip().title(), "lawyer", 1))
+
+    return TypeaheadIndex(suggestions)
+
+# Function to get the cached typeahead index for the current roster version
+get_typeahead_index = cached_per_roster_version("typeahead_index", build_typeahead_index)